@@ -23,6 +23,7 @@ class Settings:
     WATER_REMINDER_AUTO_ENABLED = os.getenv("WATER_REMINDER_AUTO_ENABLED", "true").lower() == "true"
     WATER_REMINDER_TITLE = os.getenv("WATER_REMINDER_TITLE", "Drink water")
     WATER_REMINDER_BODY = os.getenv("WATER_REMINDER_BODY", "Time to hydrate!")
+    WATER_REMINDER_DEDUPE_MINUTES = int(os.getenv("WATER_REMINDER_DEDUPE_MINUTES", 60))
     PROGRESS_REMINDER_INTERVAL_MINUTES = int(os.getenv("PROGRESS_REMINDER_INTERVAL_MINUTES", 60))
     PROGRESS_REMINDER_AUTO_ENABLED = os.getenv("PROGRESS_REMINDER_AUTO_ENABLED", "true").lower() == "true"
     PROGRESS_REMINDER_TITLE = os.getenv("PROGRESS_REMINDER_TITLE", "Progress update")
@@ -36,6 +37,10 @@ class Settings:
     TRACKING_REMINDER_AUTO_ENABLED = (
         os.getenv("TRACKING_REMINDER_AUTO_ENABLED", "true").lower() == "true"
     )
+    REMINDER_WORKERS = int(os.getenv("REMINDER_WORKERS", 32))
+    STARTUP_MIGRATIONS_ENABLED = (
+        os.getenv("STARTUP_MIGRATIONS_ENABLED", "true").lower() == "true"
+    )
     WEIGHT_REMINDER_TITLE = os.getenv("WEIGHT_REMINDER_TITLE", "Time to log your weight")
     WEIGHT_REMINDER_BODY = os.getenv(
         "WEIGHT_REMINDER_BODY",
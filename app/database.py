@@ -7,7 +7,18 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# Scheduler ticks and requests open short-lived sessions; keep their pooled
+# connections healthy so reuse never hands out a connection the server dropped.
+_engine_options = {"pool_pre_ping": True}
+if DATABASE_URL and not DATABASE_URL.startswith("sqlite"):
+    _engine_options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", 10)),
+        # Burst headroom above pool_size; each API worker can hold pool_size + max_overflow connections.
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 20)),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800)),
+    )
+
+engine = create_engine(DATABASE_URL, **_engine_options)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
@@ -29,35 +29,18 @@ from app.routers import (
     notifications,
 )
 from app.utils.response import create_response, handle_exception
-from app.utils.db_migrations import (
-    ensure_program_price_column,
-    drop_food_category_slug_and_sort,
-    ensure_user_flag_columns,
-    ensure_user_health_ack_column,
-    ensure_user_daily_goal_column,
-    ensure_user_daily_water_goal_column,
-    ensure_user_tracking_reminder_columns,
-    ensure_user_referral_columns,
-    ensure_food_item_usda_columns,
-    ensure_legal_links_subscription_column,
-    migrate_app_settings_to_legal_links,
-    ensure_video_duration_column,
-    ensure_video_payment_column,
-    drop_products_key_column,
-    ensure_product_link_column,
-)
+from app.utils.db_migrations import create_missing_tables, run_startup_migrations
 from seed import run_seed
 from app.services.water_reminder_service import reminder_scheduler
 from app.services.progress_reminder_service import progress_reminder_scheduler
 from app.services.tracking_reminder_service import tracking_reminder_scheduler
+from app.services.openfoodfacts import close_client as close_openfoodfacts_client
+from app.services.usda import close_client as close_usda_client
 
 app = FastAPI()
 app.add_middleware(SessionMiddleware, secret_key=settings.JWT_SECRET)
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
-# Auto create tables
-Base.metadata.create_all(bind=engine)
-
 # CORS for SPA / API access
 app.add_middleware(
     CORSMiddleware,
@@ -70,21 +53,10 @@ app.add_middleware(
 # Seed default user on startup
 @app.on_event("startup")
 async def startup_event():
-    ensure_program_price_column(engine)
-    drop_food_category_slug_and_sort(engine)
-    ensure_user_flag_columns(engine)
-    ensure_user_health_ack_column(engine)
-    ensure_user_daily_goal_column(engine)
-    ensure_user_daily_water_goal_column(engine)
-    ensure_user_tracking_reminder_columns(engine)
-    ensure_user_referral_columns(engine)
-    ensure_food_item_usda_columns(engine)
-    migrate_app_settings_to_legal_links(engine)
-    ensure_legal_links_subscription_column(engine)
-    ensure_video_duration_column(engine)
-    ensure_video_payment_column(engine)
-    drop_products_key_column(engine)
-    ensure_product_link_column(engine)
+    # Schema work runs here rather than at import, so importing the app never touches the database.
+    create_missing_tables(engine, Base.metadata)
+    if settings.STARTUP_MIGRATIONS_ENABLED:
+        run_startup_migrations(engine)
     run_seed()
     await reminder_scheduler.start()
     await progress_reminder_scheduler.start()
@@ -96,6 +68,8 @@ async def shutdown_event():
     await reminder_scheduler.stop()
     await progress_reminder_scheduler.stop()
     await tracking_reminder_scheduler.stop()
+    await close_openfoodfacts_client()
+    await close_usda_client()
 
 # Add routes
 app.include_router(auth.router)
@@ -1,6 +1,6 @@
 from datetime import datetime, date
 
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -8,7 +8,15 @@ from app.database import Base
 
 class HealthStep(Base):
     __tablename__ = "health_steps"
-    __table_args__ = (UniqueConstraint("user_id", "step_date", name="uq_user_step_date"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "step_date", name="uq_user_step_date"),
+        Index(
+            "ix_health_steps_user_step_date",
+            "user_id",
+            "step_date",
+            postgresql_include=["steps"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
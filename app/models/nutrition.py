@@ -6,10 +6,12 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Boolean,
     UniqueConstraint,
+    func,
 )
 from sqlalchemy.orm import relationship
 
@@ -29,6 +31,10 @@ class FoodCategory(Base):
     foods = relationship("FoodItem", back_populates="category")
 
 
+# The seeders match names case-insensitively through lower(); expression indexes keep those lookups off a scan.
+Index("ix_food_categories_lower_name", func.lower(FoodCategory.name))
+
+
 class MealConfig(Base):
     __tablename__ = "meal_configs"
 
@@ -44,6 +50,9 @@ class MealConfig(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
 
+Index("ix_meal_configs_lower_key", func.lower(MealConfig.key))
+
+
 class FoodItem(Base):
     __tablename__ = "food_items"
     __table_args__ = (UniqueConstraint("barcode", name="uq_food_barcode"),)
@@ -82,8 +91,19 @@ class FoodItem(Base):
     logs = relationship("FoodLog", back_populates="food_item")
 
 
+Index("ix_food_items_lower_product_name", func.lower(FoodItem.product_name))
+
+
 class FoodLog(Base):
     __tablename__ = "food_logs"
+    __table_args__ = (
+        Index(
+            "ix_food_logs_user_consumed_date",
+            "user_id",
+            "consumed_date",
+            postgresql_include=["calories", "protein", "carbs", "fat"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -5,6 +5,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -57,6 +58,7 @@ class AnswerOption(Base):
 
 class UserAnswer(Base):
     __tablename__ = "user_answers"
+    __table_args__ = (Index("ix_user_answers_user_question", "user_id", "question_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
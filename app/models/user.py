@@ -43,3 +43,8 @@ class User(Base):
     has_library_access = Column(Boolean, default=False, nullable=False)
     last_weight_reminder_at = Column(DateTime, nullable=True)
     last_progress_photo_reminder_at = Column(DateTime, nullable=True)
+
+    # Calorie target cached by the progress reminder scheduler
+    target_calories_cached = Column(Integer, nullable=True)
+    target_weight_kg_cached = Column(Float, nullable=True)
+    target_cached_at = Column(DateTime, nullable=True)
@@ -1,6 +1,16 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    Column,
+    Computed,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -8,11 +18,27 @@ from app.database import Base
 
 class WaterLog(Base):
     __tablename__ = "water_logs"
+    __table_args__ = (
+        Index(
+            "ix_water_logs_user_logged_at",
+            "user_id",
+            "logged_at",
+            postgresql_include=["amount_ml"],
+        ),
+        Index(
+            "ix_water_logs_user_logged_date",
+            "user_id",
+            "logged_date",
+            postgresql_include=["amount_ml"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     amount_ml = Column(Integer, nullable=False)
     logged_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # logged_at is stored as naive UTC, so date() yields the UTC calendar day.
+    logged_date = Column(Date, Computed("date(logged_at)", persisted=True))
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     user = relationship("User", backref="water_logs")
@@ -26,6 +52,7 @@ class DeviceToken(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     token = Column(String, nullable=False)
     platform = Column(String, nullable=True)
+    last_reminder_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
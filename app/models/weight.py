@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -8,6 +8,14 @@ from app.database import Base
 
 class WeightLog(Base):
     __tablename__ = "weight_logs"
+    __table_args__ = (
+        Index(
+            "ix_weight_logs_user_logged_at",
+            "user_id",
+            "logged_at",
+            postgresql_include=["weight_kg"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -7,6 +7,7 @@ from app.models.user import User
 from app.schemas.answers import UserAnswerCreate, UserAnswerResponse, UserAnswerOptionResponse
 from app.services.auth_middleware import get_current_user
 from app.services.bmi_service import recalculate_user_bmi
+from app.services.progress_reminder_service import invalidate_target_calories
 from app.services.weight_service import add_weight_log_from_answer
 from app.utils.response import create_response, handle_exception
 
@@ -99,6 +100,7 @@ def submit_answer(
             bmi_result = recalculate_user_bmi(db, current_user)
             bmi_payload = bmi_result if bmi_result is not None else {"value": None, "category": None}
 
+        invalidate_target_calories(current_user)
         db.commit()
         db.refresh(answer)
         payload = _answer_payload(answer)
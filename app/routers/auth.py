@@ -10,14 +10,14 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.models.user_session import UserSession
-from app.models.water import DeviceToken
 from app.schemas.user import RequestOtp, VerifyOtp, RefreshTokenRequest, PlatformEnum
 from app.services.gmail_oauth_service import send_email_otp
 from app.services.auth_service import create_access_token, create_refresh_token
-from app.services.auth_middleware import get_current_session
+from app.services.dashboard_service import invalidate_dashboard_metrics
+from app.services.auth_middleware import JWT_ALGORITHMS, JWT_DECODE_KEY, get_current_session
 from app.services.questionnaire_service import count_pending_required_questions
 from app.services.referral_service import normalize_referral_code, ensure_referral_code
-from app.services.firebase_service import send_push_notification
+from app.services.firebase_service import delete_device_tokens, send_push_notification
 from app.utils.response import create_response, handle_exception
 from app.config import settings
 
@@ -71,6 +71,8 @@ def request_otp(body: RequestOtp, db: Session = Depends(get_db)):
 
             db.commit()
             db.refresh(user)
+            if flow == "reactivated":
+                invalidate_dashboard_metrics()
 
         else:
             print("🆕 Creating new user:", body.email)
@@ -88,6 +90,7 @@ def request_otp(body: RequestOtp, db: Session = Depends(get_db)):
             flow = "register"
             ensure_referral_code(db, user)
             db.commit()
+            invalidate_dashboard_metrics()
 
         print("📨 Sending OTP Email...")
         send_email_otp(body.email, otp)
@@ -132,9 +135,12 @@ def resend_otp(body: RequestOtp, db: Session = Depends(get_db)):
         otp = str(random.randint(100000, 999999))
         was_verified = user.otp is None
         user.otp = otp
-        if not user.is_active:
+        reactivated = not user.is_active
+        if reactivated:
             user.is_active = True
         db.commit()
+        if reactivated:
+            invalidate_dashboard_metrics()
 
         send_email_otp(body.email, otp)
         flow = "login" if was_verified else "register"
@@ -240,11 +246,7 @@ def _maybe_send_referral_reward(db: Session, referred_user: User) -> None:
     )
     invalid_tokens = result.get("invalid_tokens") or []
     if invalid_tokens:
-        (
-            db.query(DeviceToken)
-            .filter(DeviceToken.token.in_(invalid_tokens))
-            .delete(synchronize_session=False)
-        )
+        delete_device_tokens(db, invalid_tokens)
     referred_user.referral_reward_sent = True
     db.commit()
 
@@ -255,8 +257,8 @@ def refresh_access_token(body: RefreshTokenRequest, db: Session = Depends(get_db
         try:
             payload = jwt.decode(
                 body.refresh_token,
-                settings.JWT_SECRET,
-                algorithms=[settings.ALGORITHM],
+                JWT_DECODE_KEY,
+                algorithms=JWT_ALGORITHMS,
             )
         except JWTError:
             raise HTTPException(
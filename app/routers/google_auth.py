@@ -5,6 +5,7 @@ from app.database import get_db
 from app.models.user import User
 from app.models.user_session import UserSession
 from app.services.auth_service import create_access_token, create_refresh_token
+from app.services.dashboard_service import invalidate_dashboard_metrics
 import uuid
 import os
 
@@ -45,6 +46,7 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
             db.add(user)
             db.commit()
             db.refresh(user)
+            invalidate_dashboard_metrics()
 
         # ---- generate JWT ----
         jti = str(uuid.uuid4())
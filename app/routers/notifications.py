@@ -6,10 +6,9 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import User
-from app.models.water import DeviceToken
 from app.schemas.notifications import AdminNotificationRequest
 from app.services.auth_middleware import get_current_admin
-from app.services.firebase_service import send_push_notification
+from app.services.firebase_service import delete_device_tokens, send_push_notification
 from app.utils.response import create_response, handle_exception
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
@@ -80,11 +79,7 @@ def admin_send_notification(
             invalid_tokens.extend(result.get("invalid_tokens") or [])
 
         if invalid_tokens:
-            (
-                db.query(DeviceToken)
-                .filter(DeviceToken.token.in_(invalid_tokens))
-                .delete(synchronize_session=False)
-            )
+            delete_device_tokens(db, invalid_tokens)
             db.commit()
 
         logger.info(
@@ -12,6 +12,8 @@ from app.models.water import DeviceToken, WaterLog
 from app.schemas.user import ProfileResponse, ProfileUpdate
 from app.services.auth_middleware import get_current_user
 from app.services.bmi_service import recalculate_user_bmi
+from app.services.dashboard_service import invalidate_dashboard_metrics
+from app.services.progress_reminder_service import invalidate_target_calories
 from app.services.referral_service import ensure_referral_code
 from app.utils.response import create_response, handle_exception
 
@@ -65,6 +67,9 @@ def update_profile(
         update_data = update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(user, field, value)
+        # The calorie target falls back to dob and gender, so a change to either makes it stale.
+        if "dob" in update_data or "gender" in update_data:
+            invalidate_target_calories(user)
 
         db.commit()
         db.refresh(user)
@@ -110,6 +115,7 @@ def delete_account(
 
         db.delete(user)
         db.commit()
+        invalidate_dashboard_metrics()
 
         return create_response(
             message="Account deleted successfully",
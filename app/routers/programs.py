@@ -23,6 +23,7 @@ from app.schemas.program import (
     ProgramVideoSnippet,
 )
 from app.services.auth_middleware import get_current_admin, get_current_user
+from app.services.dashboard_service import invalidate_dashboard_metrics
 from app.utils.response import create_response, handle_exception
 
 router = APIRouter(prefix="/programs", tags=["Programs"])
@@ -393,6 +394,7 @@ def create_program(
         db.add(program)
         db.commit()
         db.refresh(program)
+        invalidate_dashboard_metrics()
         payload = _program_payload(program, [])
         return create_response(
             message="Program created",
@@ -424,6 +426,7 @@ def update_program(
                 setattr(program, field, value)
         db.commit()
         db.refresh(program)
+        invalidate_dashboard_metrics()
         payload = _program_payload(program, [])
         return create_response(message="Program updated", data=payload)
     except HTTPException:
@@ -448,6 +451,7 @@ def delete_program(program_identifier: str, db: Session = Depends(get_db), admin
                 .delete(synchronize_session=False)
             )
         db.commit()
+        invalidate_dashboard_metrics()
         return create_response(message="Program deleted", data={"deleted": True})
     except HTTPException:
         raise
@@ -482,6 +486,7 @@ def create_program_day(
         db.add(day)
         db.commit()
         db.refresh(day)
+        invalidate_dashboard_metrics()
         payload = _day_payload(day)
         return create_response(
             message="Program day created",
@@ -522,6 +527,7 @@ def update_program_day(
             setattr(day, field, value)
         db.commit()
         db.refresh(day)
+        invalidate_dashboard_metrics()
         payload = _day_payload(day)
         return create_response(message="Program day updated", data=payload)
     except HTTPException:
@@ -549,6 +555,7 @@ def delete_program_day(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Program day not found")
         db.delete(day)
         db.commit()
+        invalidate_dashboard_metrics()
         return create_response(message="Program day deleted", data={"deleted": True})
     except HTTPException:
         raise
@@ -740,6 +747,7 @@ def replace_program_schedule(
             if day.day_number not in provided_numbers:
                 db.delete(day)
         db.commit()
+        invalidate_dashboard_metrics()
         refreshed = (
             db.query(ProgramDay)
             .options(joinedload(ProgramDay.video))
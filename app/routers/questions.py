@@ -14,6 +14,7 @@ from app.schemas.question import (
 )
 from app.services.auth_middleware import get_current_user, get_current_admin
 from app.services.questionnaire_service import get_pending_required_questions
+from app.services.weight_service import invalidate_kg_option, invalidate_weight_question
 from app.utils.response import create_response, handle_exception
 from app.constants import DEFAULT_ALL_GENDER_LABEL
 
@@ -107,6 +108,7 @@ def _sync_options(
 
     db.flush()
     db.refresh(question)
+    invalidate_kg_option(question.id)
 
 
 @router.post("")
@@ -131,6 +133,7 @@ def create_question(
         db.add(question)
         db.commit()
         db.refresh(question)
+        invalidate_weight_question()
 
         options_payload = body.options or []
         _ensure_choice_has_options(question.answer_type, options_payload)
@@ -246,6 +249,7 @@ def update_question(
         _ensure_choice_has_options(question.answer_type, question.options)
         db.commit()
         db.refresh(question)
+        invalidate_weight_question()
         payload = _question_payload(question)
         return create_response(
             message="Question updated successfully",
@@ -269,6 +273,8 @@ def delete_question(
 
         db.delete(question)
         db.commit()
+        invalidate_kg_option(question_id)
+        invalidate_weight_question()
 
         return create_response(
             message="Question deleted successfully",
@@ -6,9 +6,8 @@ from sqlalchemy.orm import Session
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
-from app.models.water import DeviceToken
 from app.services.auth_middleware import get_current_user
-from app.services.firebase_service import send_push_notification
+from app.services.firebase_service import delete_device_tokens, send_push_notification
 from app.services.referral_service import ensure_referral_code
 from app.utils.response import create_response, handle_exception
 
@@ -75,11 +74,7 @@ def send_coupon_notification(
         )
         invalid_tokens = result.get("invalid_tokens") or []
         if invalid_tokens:
-            (
-                db.query(DeviceToken)
-                .filter(DeviceToken.token.in_(invalid_tokens))
-                .delete(synchronize_session=False)
-            )
+            delete_device_tokens(db, invalid_tokens)
             db.commit()
 
         logger.info(
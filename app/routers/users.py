@@ -6,6 +6,7 @@ from app.models.user import User
 from app.schemas.user import ProfileResponse, UserFlagsUpdate
 from app.utils.response import create_response, handle_exception
 from app.services.auth_middleware import get_current_admin
+from app.services.dashboard_service import invalidate_dashboard_metrics
 
 router = APIRouter(prefix="/users", tags=["Users"])
 DEFAULT_PAGE_SIZE = 20
@@ -61,6 +62,7 @@ def update_user_status(
         user.is_active = is_active
         db.commit()
         db.refresh(user)
+        invalidate_dashboard_metrics()
 
         payload = ProfileResponse.model_validate(user).model_dump()
         message = "User activated successfully" if is_active else "User deactivated successfully"
@@ -19,6 +19,7 @@ from app.schemas.video import (
     VideoUpdateRequest,
     normalize_body_part,
 )
+from app.services.dashboard_service import invalidate_dashboard_metrics
 from app.services.spaces_service import (
     get_videos_by_category,
 )
@@ -161,10 +162,7 @@ def fetch_db_videos(
             .all()
         )
 
-        payload = [
-            VideoResponse.model_validate(video).model_dump()
-            for video in stored_videos
-        ]
+        payload = [video.model_dump() for video in VideoResponse.from_rows(stored_videos)]
 
         return create_response(
             message="Videos fetched from database",
@@ -232,6 +230,7 @@ def upload_video(
         db.add(new_video)
         db.commit()
         db.refresh(new_video)
+        invalidate_dashboard_metrics()
 
         payload = VideoResponse.model_validate(new_video).model_dump()
         return create_response(
@@ -274,6 +273,7 @@ def update_video(
 
         db.commit()
         db.refresh(video)
+        invalidate_dashboard_metrics()
 
         payload = VideoResponse.model_validate(video).model_dump()
         return create_response(
@@ -294,6 +294,7 @@ def delete_video(video_id: int, db: Session = Depends(get_db)):
 
         db.delete(video)
         db.commit()
+        invalidate_dashboard_metrics()
 
         return create_response(
             message="Video deleted successfully",
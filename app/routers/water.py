@@ -2,6 +2,7 @@ import logging
 from datetime import date, timedelta, datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -9,7 +10,8 @@ from app.models.water import WaterLog, DeviceToken
 from app.models.user import User
 from app.schemas.water import WaterLogCreate, WaterSummaryResponse, DeviceTokenCreate, NotificationRequest
 from app.services.auth_middleware import get_current_user
-from app.services.firebase_service import send_push_notification
+from app.services.firebase_service import delete_device_tokens, send_push_notification
+from app.services.water_reminder_service import invalidate_reminder_tokens
 from app.utils.response import create_response, handle_exception
 
 router = APIRouter(prefix="/water", tags=["Water"], dependencies=[Depends(get_current_user)])
@@ -35,18 +37,16 @@ def log_water(
         if body.amount_ml < 0:
             day = logged_at.date()
             start = datetime.combine(day, datetime.min.time())
-            end = datetime.combine(day, datetime.max.time())
-            total = (
-                db.query(WaterLog)
+            end = start + timedelta(days=1)
+            amount = (
+                db.query(func.coalesce(func.sum(WaterLog.amount_ml), 0))
                 .filter(
                     WaterLog.user_id == current_user.id,
                     WaterLog.logged_at >= start,
-                    WaterLog.logged_at <= end,
+                    WaterLog.logged_at < end,
                 )
-                .with_entities(WaterLog.amount_ml)
-                .all()
+                .scalar()
             )
-            amount = sum(value for (value,) in total)
             if amount + body.amount_ml < 0:
                 return create_response(
                     message="Water intake cannot go below zero.",
@@ -76,14 +76,12 @@ def today_water(
         logger.info("Fetching today's water total for user %s", current_user.id)
         today = datetime.utcnow().date()
         start = datetime.combine(today, datetime.min.time())
-        end = datetime.combine(today, datetime.max.time())
-        total = (
-            db.query(WaterLog)
-            .filter(WaterLog.user_id == current_user.id, WaterLog.logged_at >= start, WaterLog.logged_at <= end)
-            .with_entities(WaterLog.amount_ml)
-            .all()
+        end = start + timedelta(days=1)
+        amount = (
+            db.query(func.coalesce(func.sum(WaterLog.amount_ml), 0))
+            .filter(WaterLog.user_id == current_user.id, WaterLog.logged_at >= start, WaterLog.logged_at < end)
+            .scalar()
         )
-        amount = sum(value for (value,) in total)
         logger.info("User %s consumed %s mL of water today", current_user.id, amount)
         return create_response(
             message="Today's water intake fetched",
@@ -109,7 +107,7 @@ def water_history(
             .filter(
                 WaterLog.user_id == current_user.id,
                 WaterLog.logged_at >= datetime.combine(start_date, datetime.min.time()),
-                WaterLog.logged_at <= datetime.combine(end_date, datetime.max.time()),
+                WaterLog.logged_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()),
             )
             .all()
         )
@@ -161,6 +159,7 @@ def register_device_token(
             token_record = DeviceToken(user_id=current_user.id, token=body.token, platform=body.platform)
             db.add(token_record)
         db.commit()
+        invalidate_reminder_tokens()
         logger.info(
             "Device token %s registered for user %s (platform=%s)",
             token_record.token,
@@ -196,6 +195,7 @@ def unregister_device_token(
             )
         db.delete(token_record)
         db.commit()
+        invalidate_reminder_tokens()
         logger.info("Device token %s removed for user %s", token, current_user.id)
         return create_response(
             message="Device token removed",
@@ -229,11 +229,7 @@ def send_water_reminder(
         invalid_tokens = result.get("invalid_tokens") or []
         if invalid_tokens:
             logger.info("Cleaning up %s invalid tokens for user %s", len(invalid_tokens), current_user.id)
-            (
-                db.query(DeviceToken)
-                .filter(DeviceToken.token.in_(invalid_tokens))
-                .delete(synchronize_session=False)
-            )
+            delete_device_tokens(db, invalid_tokens)
             db.commit()
         return create_response(
             message="Reminder sent",
@@ -2,6 +2,7 @@ import logging
 from datetime import date, datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -10,6 +11,7 @@ from app.models.weight import WeightLog
 from app.schemas.weight import WeightLogCreate
 from app.services.auth_middleware import get_current_user
 from app.services.bmi_service import recalculate_user_bmi
+from app.services.progress_reminder_service import invalidate_target_calories
 from app.services.weight_service import resolve_starting_weight, sync_weight_answer_from_log
 from app.utils.response import create_response, handle_exception
 
@@ -31,7 +33,7 @@ def log_weight(
             .filter(
                 WeightLog.user_id == current_user.id,
                 WeightLog.logged_at >= datetime.combine(today, datetime.min.time()),
-                WeightLog.logged_at <= datetime.combine(today, datetime.max.time()),
+                WeightLog.logged_at < datetime.combine(today + timedelta(days=1), datetime.min.time()),
             )
             .first()
         )
@@ -40,16 +42,15 @@ def log_weight(
         if existing:
             existing.weight_kg = body.weight_kg
             existing.logged_at = logged_at
-            log_entry = existing
             message = "Weight updated successfully"
             status_code = status.HTTP_200_OK
         else:
-            log_entry = WeightLog(
-                user_id=current_user.id,
-                weight_kg=body.weight_kg,
-                logged_at=logged_at,
-            )
-            db.add(log_entry)
+            # A Core insert skips the unit of work; the response only needs values already in hand.
+            log_id = db.execute(
+                insert(WeightLog)
+                .values(user_id=current_user.id, weight_kg=body.weight_kg, logged_at=logged_at)
+                .returning(WeightLog.id)
+            ).scalar_one()
 
         bmi_payload = recalculate_user_bmi(
             db,
@@ -58,22 +59,22 @@ def log_weight(
         )
         sync_weight_answer_from_log(db, current_user, body.weight_kg)
 
+        invalidate_target_calories(current_user)
         db.commit()
-        db.refresh(log_entry)
         if not existing:
             logger.info(
                 "User %s logged weight id=%s weight=%skg at %s",
                 current_user.id,
-                log_entry.id,
-                log_entry.weight_kg,
-                log_entry.logged_at.isoformat(),
+                log_id,
+                body.weight_kg,
+                logged_at.isoformat(),
             )
 
         return create_response(
             message=message,
             data={
-                "weight_kg": log_entry.weight_kg,
-                "logged_at": log_entry.logged_at.isoformat(),
+                "weight_kg": body.weight_kg,
+                "logged_at": logged_at.isoformat(),
                 "bmi": bmi_payload,
             },
             status_code=status_code,
@@ -146,7 +147,7 @@ def weight_history(
             .filter(
                 WeightLog.user_id == current_user.id,
                 WeightLog.logged_at >= datetime.combine(start_date, datetime.min.time()),
-                WeightLog.logged_at <= datetime.combine(end_date, datetime.max.time()),
+                WeightLog.logged_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()),
             )
             .order_by(WeightLog.logged_at.desc())
             .all()
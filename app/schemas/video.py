@@ -37,12 +37,22 @@ BODY_PART_ALIASES = {
     "freeworkout2": "FREE WORKOUT #2",
 }
 
+# Canonical values and alias keys resolve directly; anything else is stripped first.
+_BODY_PART_LOOKUP = {
+    **{part.value: part.value for part in BodyPartEnum},
+    **BODY_PART_ALIASES,
+}
+_BODY_PART_STRIP_RE = re.compile(r"[^a-z0-9]")
+
 
 def normalize_body_part(value: str | None) -> str | None:
     if value in (None, ""):
         return value
     value_text = str(value)
-    key = re.sub(r"[^a-z0-9]", "", value_text.lower())
+    body_part = _BODY_PART_LOOKUP.get(value_text)
+    if body_part is not None:
+        return body_part
+    key = _BODY_PART_STRIP_RE.sub("", value_text.lower())
     if not key:
         return value_text
     return BODY_PART_ALIASES.get(key, value_text)
@@ -125,3 +135,22 @@ class VideoResponse(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+    @classmethod
+    def from_rows(cls, rows) -> list["VideoResponse"]:
+        """Build responses from trusted ORM rows without re-validating each field."""
+        return [
+            cls.model_construct(
+                id=row.id,
+                title=row.title,
+                description=row.description,
+                body_part=row.body_part,
+                gender=row.gender,
+                video_url=row.video_url,
+                thumbnail_url=row.thumbnail_url,
+                duration_seconds=row.duration_seconds,
+                requires_payment=row.requires_payment,
+                created_at=row.created_at,
+            )
+            for row in rows
+        ]
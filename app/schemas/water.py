@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta, date
 from pydantic import BaseModel, field_validator
 
+from app.utils.datetime_utils import validate_iso_datetime
+
 
 class WaterLogCreate(BaseModel):
     amount_ml: int
@@ -18,8 +20,7 @@ class WaterLogCreate(BaseModel):
     def validate_date(cls, value: str | None) -> str | None:
         if value is None:
             return None
-        datetime.fromisoformat(value)
-        return value
+        return validate_iso_datetime(value)
 
 
 class WaterSummaryEntry(BaseModel):
@@ -2,6 +2,8 @@ from datetime import datetime, date, timedelta
 
 from pydantic import BaseModel, field_validator
 
+from app.utils.datetime_utils import validate_iso_datetime
+
 
 class WeightLogCreate(BaseModel):
     weight_kg: float
@@ -19,8 +21,7 @@ class WeightLogCreate(BaseModel):
     def validate_timestamp(cls, value: str | None) -> str | None:
         if value is None:
             return None
-        datetime.fromisoformat(value)
-        return value
+        return validate_iso_datetime(value)
 
 
 class WeightLogEntry(BaseModel):
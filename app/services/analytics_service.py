@@ -1,5 +1,5 @@
 import logging
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 
 from sqlalchemy import func
 from sqlalchemy.orm import Session
@@ -19,16 +19,13 @@ def _date_range(days: int) -> tuple[date, date]:
 
 
 def _water_totals(db: Session, user_id: int, start_date: date, end_date: date) -> dict[date, int]:
-    start_dt = datetime.combine(start_date, datetime.min.time())
-    end_dt = datetime.combine(end_date, datetime.max.time())
     rows = (
-        db.query(func.date(WaterLog.logged_at), func.coalesce(func.sum(WaterLog.amount_ml), 0))
+        db.query(WaterLog.logged_date, func.coalesce(func.sum(WaterLog.amount_ml), 0))
         .filter(
             WaterLog.user_id == user_id,
-            WaterLog.logged_at >= start_dt,
-            WaterLog.logged_at <= end_dt,
+            WaterLog.logged_date.between(start_date, end_date),
         )
-        .group_by(func.date(WaterLog.logged_at))
+        .group_by(WaterLog.logged_date)
         .all()
     )
     return {row[0]: int(row[1]) for row in rows}
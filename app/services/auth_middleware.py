@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
-from jose import jwt
+from jose import jwk, jwt
 from sqlalchemy.orm import Session
 
 from app.config import settings
@@ -8,10 +8,14 @@ from app.database import get_db
 from app.models.user import User
 from app.models.user_session import UserSession
 
+# Build the HMAC key once instead of re-parsing the secret on every request.
+JWT_DECODE_KEY = jwk.construct(settings.JWT_SECRET, settings.ALGORITHM) if settings.JWT_SECRET else None
+JWT_ALGORITHMS = (settings.ALGORITHM,)
+
 
 def _get_auth_context(token: str, db: Session):
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, JWT_DECODE_KEY, algorithms=JWT_ALGORITHMS)
         email = payload.get("sub")
         jti = payload.get("jti")
         token_type = payload.get("type") or "access"
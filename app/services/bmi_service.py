@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
 
 from app.models.question import Question, UserAnswer, UserAnswerOption
 from app.models.user import User
@@ -73,8 +73,8 @@ def _get_latest_answer(db: Session, user_id: int, answer_type: str) -> UserAnswe
         db.query(UserAnswer)
         .join(Question, UserAnswer.question_id == Question.id)
         .options(
-            joinedload(UserAnswer.selected_options).joinedload(UserAnswerOption.option),
-            joinedload(UserAnswer.question),
+            selectinload(UserAnswer.selected_options).joinedload(UserAnswerOption.option),
+            contains_eager(UserAnswer.question),
         )
         .filter(UserAnswer.user_id == user_id, Question.answer_type == answer_type)
         .order_by(UserAnswer.created_at.desc())
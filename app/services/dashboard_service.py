@@ -1,3 +1,7 @@
+import time
+from collections import defaultdict
+from typing import Optional, Tuple
+
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
@@ -5,8 +9,28 @@ from app.models.user import User
 from app.models.video import Video
 from app.models.program import ProgramDay
 
+_CACHE_TTL_SECONDS = 30
+
+_metrics_cache: Optional[Tuple[float, dict]] = None
+
+
+def invalidate_dashboard_metrics() -> None:
+    """Drop cached metrics so the next dashboard load re-aggregates."""
+    global _metrics_cache
+    _metrics_cache = None
+
 
 def get_dashboard_metrics(db: Session) -> dict:
+    global _metrics_cache
+    cached = _metrics_cache
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    metrics = _build_dashboard_metrics(db)
+    _metrics_cache = (time.monotonic() + _CACHE_TTL_SECONDS, metrics)
+    return metrics
+
+
+def _build_dashboard_metrics(db: Session) -> dict:
     total_users = db.query(func.count(User.id)).scalar() or 0
     active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar() or 0
     inactive_users = total_users - active_users
@@ -20,38 +44,32 @@ def get_dashboard_metrics(db: Session) -> dict:
     def _videos_query():
         return db.query(Video).filter(~Video.id.in_(plan_video_subquery))
 
-    total_videos = _videos_query().with_entities(func.count(Video.id)).scalar() or 0
-    videos_by_body_part = (
+    # The (body_part, gender) grouping subsumes the coarser ones and the total,
+    # so fetch it once and fold.
+    category_gender_rows = (
         _videos_query()
-        .with_entities(Video.body_part, func.count(Video.id))
-        .group_by(Video.body_part)
+        .with_entities(Video.body_part, Video.gender, func.count(Video.id))
+        .group_by(Video.body_part, Video.gender)
         .all()
     )
+    body_part_counts: dict[str, int] = defaultdict(int)
+    gender_counts: dict[str, int] = defaultdict(int)
+    videos_by_category_gender = []
+    for body_part, gender, count in category_gender_rows:
+        body_part_counts[body_part] += count
+        gender_counts[gender] += count
+        videos_by_category_gender.append(
+            {"category": body_part, "gender": gender, "count": count}
+        )
+
+    total_videos = sum(body_part_counts.values())
     videos_by_body_part = [
         {"category": body_part, "count": count}
-        for body_part, count in videos_by_body_part
+        for body_part, count in body_part_counts.items()
     ]
-
-    videos_by_gender = (
-        _videos_query()
-        .with_entities(Video.gender, func.count(Video.id))
-        .group_by(Video.gender)
-        .all()
-    )
     videos_by_gender = [
         {"gender": gender, "count": count}
-        for gender, count in videos_by_gender
-    ]
-
-    videos_by_category_gender = (
-        _videos_query()
-        .with_entities(Video.body_part, Video.gender, func.count(Video.id))
-        .group_by(Video.body_part, Video.gender)
-        .all()
-    )
-    videos_by_category_gender = [
-        {"category": body_part, "gender": gender, "count": count}
-        for body_part, gender, count in videos_by_category_gender
+        for gender, count in gender_counts.items()
     ]
 
     return {
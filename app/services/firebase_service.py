@@ -1,27 +1,74 @@
+import asyncio
 import os
-from typing import List, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
 import logging
 
 import firebase_admin
 from firebase_admin import credentials, messaging
+from sqlalchemy import String, any_, bindparam
+from sqlalchemy.dialects import postgresql
 
 from app.config import settings
+from app.models.water import DeviceToken
 
 logger = logging.getLogger(__name__)
 
 FIREBASE_CREDENTIALS_FILE = settings.FIREBASE_CREDENTIALS_FILE
 
+MULTICAST_BATCH_SIZE = 500
+MULTICAST_MAX_WORKERS = 8
+
 firebase_app = None
-if FIREBASE_CREDENTIALS_FILE and os.path.exists(FIREBASE_CREDENTIALS_FILE):
-    cred = credentials.Certificate(FIREBASE_CREDENTIALS_FILE)
-    firebase_app = firebase_admin.initialize_app(cred)
-    logger.info("Firebase app initialized using %s", FIREBASE_CREDENTIALS_FILE)
-else:
-    logger.warning("Firebase credentials not configured. Notifications disabled.")
+_firebase_init_attempted = False
+_firebase_init_lock = threading.Lock()
+_multicast_executor = ThreadPoolExecutor(
+    max_workers=MULTICAST_MAX_WORKERS,
+    thread_name_prefix="fcm-multicast",
+)
+
+
+def _get_firebase_app():
+    """Initialize the Firebase app on first use instead of at import time."""
+    global firebase_app, _firebase_init_attempted
+    if _firebase_init_attempted:
+        return firebase_app
+    with _firebase_init_lock:
+        if _firebase_init_attempted:
+            return firebase_app
+        if FIREBASE_CREDENTIALS_FILE and os.path.exists(FIREBASE_CREDENTIALS_FILE):
+            cred = credentials.Certificate(FIREBASE_CREDENTIALS_FILE)
+            firebase_app = firebase_admin.initialize_app(cred)
+            logger.info("Firebase app initialized using %s", FIREBASE_CREDENTIALS_FILE)
+        else:
+            logger.warning("Firebase credentials not configured. Notifications disabled.")
+        _firebase_init_attempted = True
+    return firebase_app
+
+
+def _multicast_message(tokens: List[str], title: str, body: str, data: Dict[str, str]) -> messaging.MulticastMessage:
+    return messaging.MulticastMessage(
+        tokens=tokens,
+        notification=messaging.Notification(title=title, body=body),
+        data=data,
+    )
 
 
-def send_push_notification(tokens: List[str], title: str, body: str, data: Dict[str, str] | None = None) -> dict:
-    if not firebase_app:
+def _send_multicast_chunk(tokens: List[str], title: str, body: str, data: Dict[str, str]):
+    return messaging.send_each_for_multicast(_multicast_message(tokens, title, body, data))
+
+
+def _token_chunks(tokens: Sequence[str]) -> List[List[str]]:
+    # The SDK only accepts lists, so callers may pass a compact tuple and get list chunks back.
+    return [
+        list(tokens[idx : idx + MULTICAST_BATCH_SIZE])
+        for idx in range(0, len(tokens), MULTICAST_BATCH_SIZE)
+    ]
+
+
+def send_push_notification(tokens: Sequence[str], title: str, body: str, data: Dict[str, str] | None = None) -> dict:
+    if not _get_firebase_app():
         raise RuntimeError("Firebase app is not configured. Set FIREBASE_CREDENTIALS_FILE env.")
 
     if not tokens:
@@ -30,37 +77,114 @@ def send_push_notification(tokens: List[str], title: str, body: str, data: Dict[
 
     logger.info("Sending push notification to %s tokens title=%s", len(tokens), title)
 
-    message = messaging.MulticastMessage(
-        tokens=tokens,
-        notification=messaging.Notification(title=title, body=body),
-        data=data or {},
+    payload = data or {}
+    chunks = _token_chunks(tokens)
+    if len(chunks) == 1:
+        batch_responses = [_send_multicast_chunk(chunks[0], title, body, payload)]
+    else:
+        # Overlap the per-chunk HTTP round trips instead of sending chunks serially.
+        futures = [
+            _multicast_executor.submit(_send_multicast_chunk, chunk, title, body, payload)
+            for chunk in chunks
+        ]
+        batch_responses = []
+        for future in futures:
+            try:
+                batch_responses.append(future.result())
+            except Exception as exc:
+                batch_responses.append(exc)
+    return _summarize_batch_responses(chunks, batch_responses)
+
+
+async def send_push_notification_async(
+    tokens: Sequence[str],
+    title: str,
+    body: str,
+    data: Dict[str, str] | None = None,
+) -> dict:
+    """Async variant of send_push_notification; chunks share the SDK's HTTP/2 client."""
+    if not _get_firebase_app():
+        raise RuntimeError("Firebase app is not configured. Set FIREBASE_CREDENTIALS_FILE env.")
+
+    if not tokens:
+        logger.info("send_push_notification_async called with empty token list.")
+        return {"success": 0, "failure": 0}
+
+    logger.info("Sending push notification to %s tokens title=%s", len(tokens), title)
+
+    payload = data or {}
+    chunks = _token_chunks(tokens)
+    # Same cap on in-flight chunks as the synchronous executor.
+    semaphore = asyncio.Semaphore(MULTICAST_MAX_WORKERS)
+
+    async def send_chunk(chunk: List[str]):
+        async with semaphore:
+            return await messaging.send_each_for_multicast_async(
+                _multicast_message(chunk, title, body, payload)
+            )
+
+    batch_responses = await asyncio.gather(
+        *(send_chunk(chunk) for chunk in chunks),
+        return_exceptions=True,
     )
+    return _summarize_batch_responses(chunks, batch_responses)
+
+
+def _summarize_batch_responses(chunks: List[List[str]], batch_responses) -> dict:
+    """Merge per-chunk results; a chunk whose request raised counts all its tokens as failed."""
+    failed_chunks = [
+        (chunk, response)
+        for chunk, response in zip(chunks, batch_responses)
+        if isinstance(response, Exception)
+    ]
+    if failed_chunks and len(failed_chunks) == len(chunks):
+        raise failed_chunks[0][1]
+    for chunk, exc in failed_chunks:
+        logger.error("Multicast chunk of %s tokens failed", len(chunk), exc_info=exc)
 
-    response = messaging.send_each_for_multicast(message)
-    logger.info("Push result success=%s failure=%s", response.success_count, response.failure_count)
+    success_count = 0
+    failure_count = sum(len(chunk) for chunk, _ in failed_chunks)
     invalid_tokens: list[str] = []
     errors: list[dict] = []
-    for idx, resp in enumerate(response.responses):
-        token = tokens[idx]
-        if resp.success:
-            logger.debug("Token %s delivered", token)
+    for chunk, response in zip(chunks, batch_responses):
+        if isinstance(response, Exception):
             continue
-        error_message = str(resp.exception)
-        error_code = getattr(resp.exception, "code", None)
-        logger.warning("Token %s failed: %s (code=%s)", token, error_message, error_code)
-        errors.append({"token": token, "code": error_code, "message": error_message})
-        if _should_invalidate_token(error_code, error_message):
-            invalid_tokens.append(token)
+        success_count += response.success_count
+        failure_count += response.failure_count
+        for token, resp in zip(chunk, response.responses):
+            if resp.success:
+                logger.debug("Token %s delivered", token)
+                continue
+            error_message = str(resp.exception)
+            error_code = getattr(resp.exception, "code", None)
+            logger.warning("Token %s failed: %s (code=%s)", token, error_message, error_code)
+            errors.append({"token": token, "code": error_code, "message": error_message})
+            if _should_invalidate_token(error_code, error_message):
+                invalid_tokens.append(token)
+    logger.info("Push result success=%s failure=%s", success_count, failure_count)
     if invalid_tokens:
         logger.info("Identified %s invalid tokens to remove", len(invalid_tokens))
     return {
-        "success": response.success_count,
-        "failure": response.failure_count,
+        "success": success_count,
+        "failure": failure_count,
         "invalid_tokens": invalid_tokens,
         "errors": errors,
     }
 
 
+def delete_device_tokens(db, tokens: List[str]) -> None:
+    """Delete the given device tokens in the caller's transaction; the caller commits."""
+    if not tokens:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        # One array parameter instead of one placeholder per token.
+        tokens_param = bindparam("tokens", list(tokens), type_=postgresql.ARRAY(String))
+        condition = DeviceToken.token == any_(tokens_param)
+    else:
+        condition = DeviceToken.token.in_(tokens)
+    db.query(DeviceToken).filter(condition).delete(synchronize_session=False)
+
+
 def _should_invalidate_token(error_code: str | None, error_message: str) -> bool:
     normalized_code = (error_code or "").lower()
     normalized_message = (error_message or "").lower()
@@ -61,7 +61,10 @@
 #     return send_email(to_email, subject, body)
 import os
 import base64
-from email.mime.text import MIMEText
+import threading
+from email.header import Header
+
+import httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
@@ -150,57 +153,114 @@ OTP_TEMPLATE = """
   </body>
 </html>
 """
+# Split once so each send is a concatenation rather than a scan of the HTML.
+_OTP_PREFIX, _OTP_SUFFIX = OTP_TEMPLATE.split("{{OTP}}", 1)
 
 
 # -----------------------------
 #  AUTHENTICATE AND GET GMAIL SERVICE
 # -----------------------------
+_CREDS = None
+_CREDS_LOCK = threading.Lock()
+
+
+def _get_credentials():
+    global _CREDS
+    with _CREDS_LOCK:
+        creds = _CREDS
+
+        # Load saved Gmail token.json once; later calls reuse the parsed creds
+        if creds is None and os.path.exists(TOKEN_PATH):
+            creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+
+        # No valid token? Run Google OAuth
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                # Opens Google login in browser
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    CREDENTIALS_PATH, SCOPES
+                )
+                creds = flow.run_local_server(port=0)
+
+            # Save token.json
+            with open(TOKEN_PATH, "w") as token:
+                token.write(creds.to_json())
+
+        _CREDS = creds
+        return creds
+
+
 def get_gmail_service():
-    creds = None
+    creds = _get_credentials()
+
+    # Build Gmail API client from the bundled discovery document
+    return build("gmail", "v1", credentials=creds, cache_discovery=False)
+
+
+# -----------------------------
+#  PERSISTENT GMAIL CONNECTION
+# -----------------------------
+# httplib2 connections are not thread-safe, so each worker thread keeps its
+# own service (and its open HTTPS connection) alive across sends.
+_thread_local = threading.local()
 
-    # Load saved Gmail token.json
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
 
-    # No valid token? Run Google OAuth
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            # Opens Google login in browser
-            flow = InstalledAppFlow.from_client_secrets_file(
-                CREDENTIALS_PATH, SCOPES
-            )
-            creds = flow.run_local_server(port=0)
+def _get_cached_gmail_service():
+    service = getattr(_thread_local, "service", None)
+    if service is None:
+        service = get_gmail_service()
+        _thread_local.service = service
+    return service
 
-        # Save token.json
-        with open(TOKEN_PATH, "w") as token:
-            token.write(creds.to_json())
 
-    # Build Gmail API client
-    return build("gmail", "v1", credentials=creds)
+def _reset_cached_gmail_service():
+    _thread_local.service = None
+
+
+def _send_raw_message(body: dict):
+    try:
+        service = _get_cached_gmail_service()
+        return service.users().messages().send(userId="me", body=body).execute()
+    except (httplib2.HttpLib2Error, OSError):
+        # Stale keep-alive connection: reconnect once and retry.
+        _reset_cached_gmail_service()
+        service = _get_cached_gmail_service()
+        return service.users().messages().send(userId="me", body=body).execute()
 
 
 # -----------------------------
 #  SEND GENERIC EMAIL
 # -----------------------------
-def send_email(to_email: str, subject: str, html_message: str):
-    service = get_gmail_service()
+_HTML_PART_HEADERS = (
+    b"MIME-Version: 1.0\r\n"
+    b'Content-Type: text/html; charset="utf-8"\r\n'
+    b"Content-Transfer-Encoding: base64\r\n"
+)
 
-    msg = MIMEText(html_message, "html")
-    msg["to"] = to_email
-    msg["subject"] = subject
 
-    encoded_msg = base64.urlsafe_b64encode(msg.as_bytes()).decode()
+def _header_value(value: str) -> str:
+    # Drop line breaks so a value can never start a new header.
+    value = " ".join(value.splitlines())
+    if value.isascii():
+        return value
+    return Header(value, "utf-8").encode()
+
+
+def _build_raw_html_message(to_email: str, subject: str, html_message: str) -> bytes:
+    """Serialize a single-part HTML message without building an email.message tree."""
+    headers = f"To: {_header_value(to_email)}\r\nSubject: {_header_value(subject)}\r\n".encode()
+    return headers + _HTML_PART_HEADERS + b"\r\n" + base64.encodebytes(html_message.encode("utf-8"))
+
+
+def send_email(to_email: str, subject: str, html_message: str):
+    raw_message = _build_raw_html_message(to_email, subject, html_message)
+    encoded_msg = base64.urlsafe_b64encode(raw_message).decode()
 
     body = {"raw": encoded_msg}
 
-    result = (
-        service.users()
-        .messages()
-        .send(userId="me", body=body)
-        .execute()
-    )
+    result = _send_raw_message(body)
 
     print("Email sent! ID:", result["id"])
     return result
@@ -210,5 +270,5 @@ def send_email(to_email: str, subject: str, html_message: str):
 #  SEND OTP FUNCTION (READY TO USE)
 # -----------------------------
 def send_email_otp(to_email: str, otp: str):
-    html = OTP_TEMPLATE.replace("{{OTP}}", otp)
+    html = f"{_OTP_PREFIX}{otp}{_OTP_SUFFIX}"
     return send_email(to_email, "Your Simple Starts OTP Code", html)
@@ -19,17 +19,34 @@ _HEIGHT_UNIT_ALIASES = {
     "in": {"in", "inch", "inches"},
 }
 
+
+def _flatten_aliases(mapping: dict[str, set[str]]) -> dict[str, str]:
+    return {
+        alias: canonical
+        for canonical, aliases in mapping.items()
+        for alias in aliases | {canonical}
+    }
+
+
+_WEIGHT_ALIAS_TO_CANON = _flatten_aliases(_WEIGHT_UNIT_ALIASES)
+_HEIGHT_ALIAS_TO_CANON = _flatten_aliases(_HEIGHT_UNIT_ALIASES)
+
+# Multipliers from each canonical unit; unknown or missing units pass through unchanged.
+_WEIGHT_TO_KG = {"lb": 0.45359237, "oz": 0.0283495, "stone": 6.35029318}
+_HEIGHT_TO_M = {"cm": 0.01, "ft": 0.3048, "in": 0.0254}
+
 _NUMERIC_REGEX = re.compile(r"-?\d+(?:\.\d+)?")
+_NUMERIC_SEARCH = _NUMERIC_REGEX.search
 
 
 def parse_numeric_value(raw: Optional[str]) -> Optional[float]:
     if not raw:
         return None
-    match = _NUMERIC_REGEX.search(raw)
+    match = _NUMERIC_SEARCH(raw)
     if not match:
         return None
     try:
-        return float(match.group(0))
+        return float(match.group())
     except ValueError:
         return None
 
@@ -41,13 +58,10 @@ def normalize_unit(raw: Optional[str]) -> Optional[str]:
     return normalized or None
 
 
-def _map_unit(value: Optional[str], mapping: dict[str, set[str]]) -> Optional[str]:
+def _map_unit(value: Optional[str], mapping: dict[str, str]) -> Optional[str]:
     if not value:
         return None
-    for canonical, aliases in mapping.items():
-        if value == canonical or value in aliases:
-            return canonical
-    return None
+    return mapping.get(value)
 
 
 def resolve_weight_unit(answer: UserAnswer) -> Optional[str]:
@@ -56,7 +70,7 @@ def resolve_weight_unit(answer: UserAnswer) -> Optional[str]:
             continue
         for source in (selection.option.value, selection.option.option_text):
             normalized = normalize_unit(source)
-            resolved = _map_unit(normalized, _WEIGHT_UNIT_ALIASES)
+            resolved = _map_unit(normalized, _WEIGHT_ALIAS_TO_CANON)
             if resolved:
                 return resolved
     return None
@@ -68,7 +82,7 @@ def resolve_height_unit(answer: UserAnswer) -> Optional[str]:
             continue
         for source in (selection.option.value, selection.option.option_text):
             normalized = normalize_unit(source)
-            resolved = _map_unit(normalized, _HEIGHT_UNIT_ALIASES)
+            resolved = _map_unit(normalized, _HEIGHT_ALIAS_TO_CANON)
             if resolved:
                 return resolved
     return None
@@ -77,25 +91,13 @@ def resolve_height_unit(answer: UserAnswer) -> Optional[str]:
 def convert_weight_to_kg(value: float, unit: Optional[str]) -> Optional[float]:
     if value < 0:
         return None
-    if unit == "lb":
-        return value * 0.45359237
-    if unit == "oz":
-        return value * 0.0283495
-    if unit == "stone":
-        return value * 6.35029318
-    return value
+    return value * _WEIGHT_TO_KG.get(unit, 1.0)
 
 
 def convert_height_to_m(value: float, unit: Optional[str]) -> Optional[float]:
     if value < 0:
         return None
-    if unit == "cm":
-        return value / 100
-    if unit == "ft":
-        return value * 0.3048
-    if unit == "in":
-        return value * 0.0254
-    return value
+    return value * _HEIGHT_TO_M.get(unit, 1.0)
 
 
 def weight_kg_from_answer(answer: UserAnswer) -> Optional[float]:
@@ -4,6 +4,20 @@ TSP_ML = 5.0
 TBSP_ML = 15.0
 CUP_ML = 250.0
 
+_VOLUME_UNIT_ML = {
+    "ml": 1.0,
+    "milliliter": 1.0,
+    "milliliters": 1.0,
+    "tsp": TSP_ML,
+    "teaspoon": TSP_ML,
+    "teaspoons": TSP_ML,
+    "tbsp": TBSP_ML,
+    "tablespoon": TBSP_ML,
+    "tablespoons": TBSP_ML,
+    "cup": CUP_ML,
+    "cups": CUP_ML,
+}
+
 
 def _safe_value(value: float | None) -> float:
     return 0.0 if value is None else float(value)
@@ -17,16 +31,10 @@ def normalize_food_type(value: str | None) -> str | None:
 
 
 def volume_to_ml(amount: float, unit: str) -> float:
-    normalized = unit.strip().lower()
-    if normalized in {"ml", "milliliter", "milliliters"}:
-        return amount
-    if normalized in {"tsp", "teaspoon", "teaspoons"}:
-        return amount * TSP_ML
-    if normalized in {"tbsp", "tablespoon", "tablespoons"}:
-        return amount * TBSP_ML
-    if normalized in {"cup", "cups"}:
-        return amount * CUP_ML
-    raise ValueError(f"Unsupported volume unit: {unit}")
+    factor = _VOLUME_UNIT_ML.get(unit.strip().lower())
+    if factor is None:
+        raise ValueError(f"Unsupported volume unit: {unit}")
+    return amount * factor
 
 
 def derive_default_serving_grams(
@@ -1,3 +1,6 @@
+import asyncio
+import re
+import time
 from datetime import datetime
 import httpx
 
@@ -5,28 +8,80 @@ from app.models.nutrition import FoodItem
 
 BASE_URL = "https://world.openfoodfacts.org/api/v0/product/{barcode}.json"
 
+_NUM_RE = re.compile(r"-?(?:\d+(?:\.\d*)?|\.\d+)")
+
+PRODUCT_CACHE_TTL_SECONDS = 3600
+PRODUCT_CACHE_MAX_ENTRIES = 4096
+
+_client: httpx.AsyncClient | None = None
+# barcode -> {"value": product payload or None, "expires_at": monotonic deadline}
+_product_cache: dict[str, dict] = {}
+# barcode -> lookup task shared by concurrent callers
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared client so lookups reuse pooled keep-alive connections."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10,
+            headers={"User-Agent": "FitnessAppBackend/1.0"},
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 def _to_float(value):
     if value is None:
         return None
     if isinstance(value, (int, float)):
         return float(value)
+    text = str(value)
     try:
-        return float(str(value).split()[0])
-    except (ValueError, TypeError):
-        digits = "".join(ch for ch in str(value) if ch.isdigit() or ch in {".", "-"})
-        return float(digits) if digits else None
+        return float(text)
+    except ValueError:
+        match = _NUM_RE.search(text)
+        return float(match.group()) if match else None
 
 
 async def fetch_product(barcode: str) -> dict | None:
-    headers = {"User-Agent": "FitnessAppBackend/1.0"}
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.get(BASE_URL.format(barcode=barcode), headers=headers)
-        response.raise_for_status()
-        payload = response.json()
-    if payload.get("status") != 1:
-        return None
-    return payload.get("product")
+    entry = _product_cache.get(barcode)
+    if entry and entry["expires_at"] > time.monotonic():
+        return entry["value"]
+
+    task = _inflight.get(barcode)
+    if task is None:
+        task = asyncio.ensure_future(_request_product(barcode))
+        _inflight[barcode] = task
+        task.add_done_callback(lambda _: _inflight.pop(barcode, None))
+    # Shield so one cancelled caller does not abort the lookup for the others.
+    return await asyncio.shield(task)
+
+
+async def _request_product(barcode: str) -> dict | None:
+    response = await _get_client().get(BASE_URL.format(barcode=barcode))
+    response.raise_for_status()
+    payload = response.json()
+    product = payload.get("product") if payload.get("status") == 1 else None
+    _store_product(barcode, product)
+    return product
+
+
+def _store_product(barcode: str, product: dict | None) -> None:
+    if barcode not in _product_cache and len(_product_cache) >= PRODUCT_CACHE_MAX_ENTRIES:
+        _product_cache.pop(next(iter(_product_cache)))
+    _product_cache[barcode] = {
+        "value": product,
+        "expires_at": time.monotonic() + PRODUCT_CACHE_TTL_SECONDS,
+    }
 
 
 def map_product(product: dict) -> dict:
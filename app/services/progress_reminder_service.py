@@ -1,25 +1,29 @@
 import asyncio
 import logging
+import re
 from collections import defaultdict
-from datetime import date, datetime
+from itertools import groupby
+from datetime import date, datetime, timedelta
 
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func, or_
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 
 from app.config import settings
 from app.database import SessionLocal
 from app.models.health import HealthStep
 from app.models.nutrition import FoodLog
-from app.models.question import Question, UserAnswer, UserAnswerOption
+from app.models.question import AnswerOption, Question, UserAnswer, UserAnswerOption
 from app.models.user import User
 from app.models.water import DeviceToken
 from app.models.weight import WeightLog
-from app.services.firebase_service import send_push_notification
+from app.services.firebase_service import delete_device_tokens, send_push_notification_async
 from app.services.measurement_utils import (
     convert_height_to_m,
     parse_numeric_value,
     resolve_height_unit,
     weight_kg_from_answer,
 )
+from app.utils.scheduler_lock import SchedulerLock
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,45 @@ MAX_BASE_CALORIES = 4000
 ACTIVITY_MULTIPLIER = 1.2
 BMR_MALE_OFFSET = 5
 BMR_FEMALE_OFFSET = -161
+_BMR_GENDER_OFFSETS = {"male": BMR_MALE_OFFSET, "female": BMR_FEMALE_OFFSET}
+TARGET_CACHE_TTL_SECONDS = 3600
+PUSH_CONCURRENCY = 32
+
+# Question classifiers, matched against lower-cased question text.
+_QUESTION_ROLE_KEYWORDS = {
+    "goal_weight": ("goal weight", "target weight"),
+    "current_weight": ("current weight",),
+    "timeframe": ("week", "month", "time", "reach"),
+    "birth_date": ("date of birth", "dob", "birth"),
+    "gender": ("gender",),
+    "height": ("height",),
+}
+_QUESTION_ROLE_PATTERNS = tuple(
+    (role, re.compile("|".join(re.escape(keyword) for keyword in keywords)))
+    for role, keywords in _QUESTION_ROLE_KEYWORDS.items()
+)
+# Answer types the weight/height fallbacks read regardless of question wording.
+_RELEVANT_ANSWER_TYPES = ("weight", "height")
+
+# Question wording is shared by every user, so classify each distinct question once.
+# Keyed by content rather than id so an edited question is reclassified.
+QUESTION_PROFILE_CACHE_MAX_ENTRIES = 4096
+_question_profile_cache: dict[tuple[str, str], tuple[frozenset[str], str]] = {}
+
+
+def invalidate_target_calories(user: User) -> None:
+    """Mark the stored calorie target stale after the user's weight or answers change."""
+    user.target_cached_at = None
+
+
+def _target_is_fresh(user: User) -> bool:
+    cutoff = datetime.utcnow() - timedelta(seconds=TARGET_CACHE_TTL_SECONDS)
+    return user.target_cached_at is not None and user.target_cached_at > cutoff
+
+
+def _store_target(user: User, value: tuple[int, float] | None, now: datetime) -> None:
+    user.target_calories_cached, user.target_weight_kg_cached = value if value else (None, None)
+    user.target_cached_at = now
 
 
 class ProgressReminderScheduler:
@@ -40,6 +83,7 @@ class ProgressReminderScheduler:
         self.enabled = enabled
         self._task: asyncio.Task | None = None
         self._stop_event = asyncio.Event()
+        self._lock = SchedulerLock("progress_reminders")
 
     async def start(self) -> None:
         if not self.enabled:
@@ -48,7 +92,8 @@ class ProgressReminderScheduler:
         if self._task and not self._task.done():
             return
         logger.info("Starting progress reminders every %s minutes", self.interval_seconds / 60)
-        self._stop_event.clear()
+        # A fresh event binds to the running loop, so a stopped scheduler can start on a new one.
+        self._stop_event = asyncio.Event()
         self._task = asyncio.create_task(self._run())
 
     async def stop(self) -> None:
@@ -57,58 +102,216 @@ class ProgressReminderScheduler:
         self._stop_event.set()
         await self._task
         self._task = None
+        await asyncio.to_thread(self._lock.release)
 
     async def _run(self) -> None:
         while not self._stop_event.is_set():
-            await self._send_reminders()
+            # Under multiple workers only the lock holder fans out pushes; checked every
+            # tick so another worker takes over if the holder's lock session drops.
+            if await asyncio.to_thread(self._lock.acquire):
+                await self._send_reminders()
             try:
                 await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval_seconds)
             except asyncio.TimeoutError:
                 continue
 
     async def _send_reminders(self) -> None:
-        session = SessionLocal()
-        try:
-            token_rows = (
-                session.query(DeviceToken)
-                .join(User, User.id == DeviceToken.user_id)
-                .filter(User.is_active == True)
-                .all()
-            )
-            tokens_by_user: dict[int, list[str]] = defaultdict(list)
-            for token in token_rows:
-                tokens_by_user[token.user_id].append(token.token)
-
-            if not tokens_by_user:
-                logger.debug("Skipping progress reminders; no device tokens registered.")
-                return
-
-            invalid_tokens: list[str] = []
-            for user_id, tokens in tokens_by_user.items():
-                reminder = _build_user_reminder(session, user_id)
-                if reminder is None:
-                    continue
-                title, body, payload = reminder
-                try:
-                    result = send_push_notification(tokens, title, body, data=payload)
-                    invalid_tokens.extend(result.get("invalid_tokens") or [])
-                except Exception:
-                    logger.exception("Failed to send progress reminder for user %s", user_id)
-
-            if invalid_tokens:
-                logger.info("Progress reminders removing %s invalid tokens", len(invalid_tokens))
-                session.query(DeviceToken).filter(DeviceToken.token.in_(invalid_tokens)).delete(synchronize_session=False)
-                session.commit()
-        finally:
-            session.close()
-
-
-def _build_user_reminder(session, user_id: int) -> tuple[str, str, dict[str, str]] | None:
-    target_payload = calculate_target_calories(session, user_id)
-    if not target_payload:
-        return None
-    target_calories, burned_calories = target_payload
-    consumed_calories = _todays_consumed_calories(session, user_id)
+        # Database work is blocking, so keep it off the event loop.
+        groups = await asyncio.to_thread(_collect_reminder_groups)
+        if not groups:
+            return
+
+        semaphore = asyncio.Semaphore(PUSH_CONCURRENCY)
+
+        async def send_group(tokens: list[str], title: str, body: str, payload: dict[str, str]) -> dict:
+            async with semaphore:
+                return await send_push_notification_async(tokens, title, body, data=payload)
+
+        results = await asyncio.gather(
+            *(
+                send_group(tokens, title, body, dict(payload))
+                for (title, body, payload), tokens in groups.items()
+            ),
+            return_exceptions=True,
+        )
+        invalid_tokens: list[str] = []
+        for ((title, _, _), tokens), result in zip(groups.items(), results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Failed to send progress reminder '%s' to %s devices",
+                    title,
+                    len(tokens),
+                    exc_info=result,
+                )
+                continue
+            invalid_tokens.extend(result.get("invalid_tokens") or [])
+
+        if invalid_tokens:
+            logger.info("Progress reminders removing %s invalid tokens", len(invalid_tokens))
+            await asyncio.to_thread(_delete_device_tokens, invalid_tokens)
+
+
+def _collect_reminder_groups() -> dict[tuple[str, str, tuple[tuple[str, str], ...]], list[str]]:
+    """Build reminders for every active user with a device token, grouped by identical message."""
+    session = SessionLocal()
+    try:
+        tokens_by_user = _active_tokens_by_user(session)
+        if not tokens_by_user:
+            logger.debug("Skipping progress reminders; no device tokens registered.")
+            return {}
+
+        user_ids = list(tokens_by_user)
+        # One clock reading per tick, shared by every user's computation.
+        now = datetime.utcnow()
+        today = date.today()
+        _refresh_stale_targets(session, user_ids, now, today)
+
+        # Users with an identical reminder share one multicast.
+        groups: dict[tuple[str, str, tuple[tuple[str, str], ...]], list[str]] = defaultdict(list)
+        for user_id, target_calories, weight_kg, steps, consumed in _users_with_calories_left(session, user_ids, today):
+            reminder = _build_user_reminder(target_calories, weight_kg, steps, consumed)
+            if reminder is None:
+                continue
+            title, body, payload = reminder
+            groups[(title, body, tuple(sorted(payload.items())))].extend(tokens_by_user[user_id])
+        return groups
+    finally:
+        session.close()
+
+
+def _active_tokens_by_user(session) -> dict[int, list[str]]:
+    if session.get_bind().dialect.name == "postgresql":
+        rows = (
+            session.query(DeviceToken.user_id, func.array_agg(DeviceToken.token))
+            .join(User, User.id == DeviceToken.user_id)
+            .filter(User.is_active == True)
+            .group_by(DeviceToken.user_id)
+            .all()
+        )
+        return {user_id: list(tokens) for user_id, tokens in rows}
+
+    # No array aggregate elsewhere; fetch the two columns and group here.
+    tokens_by_user: dict[int, list[str]] = defaultdict(list)
+    rows = (
+        session.query(DeviceToken.user_id, DeviceToken.token)
+        .join(User, User.id == DeviceToken.user_id)
+        .filter(User.is_active == True)
+        .all()
+    )
+    for user_id, token in rows:
+        tokens_by_user[user_id].append(token)
+    return tokens_by_user
+
+
+def _delete_device_tokens(tokens: list[str]) -> None:
+    session = SessionLocal()
+    try:
+        delete_device_tokens(session, tokens)
+        session.commit()
+    finally:
+        session.close()
+
+
+def _refresh_stale_targets(session, user_ids: list[int], now: datetime, today: date) -> None:
+    """Recompute and store calorie targets that are missing or older than the TTL."""
+    cutoff = now - timedelta(seconds=TARGET_CACHE_TTL_SECONDS)
+    users = (
+        session.query(User)
+        .filter(
+            User.id.in_(user_ids),
+            or_(User.target_cached_at.is_(None), User.target_cached_at <= cutoff),
+        )
+        .all()
+    )
+    if not users:
+        return
+    stale_ids = [user.id for user in users]
+
+    latest_weight_ranked = (
+        session.query(
+            WeightLog.user_id.label("user_id"),
+            WeightLog.weight_kg.label("weight_kg"),
+            func.row_number()
+            .over(partition_by=WeightLog.user_id, order_by=WeightLog.logged_at.desc())
+            .label("rank"),
+        )
+        .filter(WeightLog.user_id.in_(stale_ids))
+        .subquery()
+    )
+    latest_weights = (
+        session.query(latest_weight_ranked.c.user_id, latest_weight_ranked.c.weight_kg)
+        .filter(latest_weight_ranked.c.rank == 1)
+        .all()
+    )
+
+    answers_by_user = {
+        user_id: list(answers)
+        for user_id, answers in groupby(
+            _fetch_answers_for_users(session, stale_ids),
+            key=lambda answer: answer.user_id,
+        )
+    }
+
+    weights_by_user = {user_id: weight_kg for user_id, weight_kg in latest_weights}
+    for user in users:
+        target = _resolve_target(
+            current_weight=weights_by_user.get(user.id),
+            answers=answers_by_user.get(user.id, []),
+            user=user,
+            today=today,
+        )
+        _store_target(user, target, now)
+    session.commit()
+
+
+def _users_with_calories_left(
+    session, user_ids: list[int], today: date
+) -> list[tuple[int, int, float, int, float]]:
+    """Return (user_id, target, weight_kg, steps, consumed) for users still under today's allowance."""
+    consumed = (
+        session.query(
+            FoodLog.user_id.label("user_id"),
+            func.sum(FoodLog.calories).label("calories"),
+        )
+        .filter(FoodLog.user_id.in_(user_ids), FoodLog.consumed_date == today)
+        .group_by(FoodLog.user_id)
+        .subquery()
+    )
+    steps = (
+        session.query(HealthStep.user_id.label("user_id"), HealthStep.steps.label("steps"))
+        .filter(HealthStep.user_id.in_(user_ids), HealthStep.step_date == today)
+        .subquery()
+    )
+    consumed_calories = func.coalesce(consumed.c.calories, 0)
+    step_count = func.coalesce(steps.c.steps, 0)
+    # Unrounded burned calories; the exact remaining figure is recomputed in Python.
+    burned_calories = step_count * CALORIES_PER_STEP * User.target_weight_kg_cached / REFERENCE_WEIGHT_KG
+    return (
+        session.query(
+            User.id,
+            User.target_calories_cached,
+            User.target_weight_kg_cached,
+            step_count,
+            consumed_calories,
+        )
+        .outerjoin(consumed, consumed.c.user_id == User.id)
+        .outerjoin(steps, steps.c.user_id == User.id)
+        .filter(
+            User.id.in_(user_ids),
+            User.target_calories_cached.isnot(None),
+            User.target_calories_cached + burned_calories - consumed_calories > 0,
+        )
+        .all()
+    )
+
+
+def _build_user_reminder(
+    target_calories: int,
+    weight_kg: float,
+    steps: int,
+    consumed_calories: float,
+) -> tuple[str, str, dict[str, str]] | None:
+    burned_calories = _burned_calories(steps or 0, weight_kg)
     daily_allowance = target_calories + burned_calories
     remaining = round(daily_allowance - consumed_calories)
     if remaining <= 0:
@@ -125,21 +328,46 @@ def _build_user_reminder(session, user_id: int) -> tuple[str, str, dict[str, str
 
 
 def calculate_target_calories(session, user_id: int) -> tuple[int, int] | None:
-    current_weight = _latest_weight_kg(session, user_id)
-    answers = _fetch_answers(session, user_id)
     user = session.query(User).filter(User.id == user_id).first()
+    if user and _target_is_fresh(user):
+        target = None
+        if user.target_calories_cached is not None:
+            target = (user.target_calories_cached, user.target_weight_kg_cached)
+    else:
+        target = _resolve_target(
+            current_weight=_latest_weight_kg(session, user_id),
+            answers=_fetch_answers(session, user_id),
+            user=user,
+        )
+    if not target:
+        return None
+    target_calories, weight_kg = target
+    # Steps change throughout the day, so burned calories are never cached.
+    return target_calories, _burned_calories(_todays_steps(session, user_id), weight_kg)
+
+
+def _resolve_target(
+    *,
+    current_weight: float | None,
+    answers: list[UserAnswer],
+    user: User | None,
+    today: date | None = None,
+) -> tuple[int, float] | None:
+    """Return the daily calorie target and the weight it was computed from."""
+    today = today or date.today()
+    entries = _normalize_answers(answers)
     if current_weight is None:
-        current_weight = _current_weight_from_answers(answers)
-    goal_weight = _goal_weight_from_answers(answers)
-    timeframe_days = _goal_timeframe_days_from_answers(answers)
+        current_weight = _current_weight_from_answers(entries)
+    goal_weight = _goal_weight_from_answers(entries)
+    timeframe_days = _goal_timeframe_days_from_answers(entries)
     if current_weight is None or goal_weight is None or not timeframe_days:
         return None
 
-    height_cm = _height_cm_from_answers(answers)
-    age_years = _age_years_from_answers(answers)
+    height_cm = _height_cm_from_answers(entries)
+    age_years = _age_years_from_answers(entries, today)
     if age_years is None and user and user.dob:
-        age_years = _age_from_raw_date(user.dob)
-    gender = _gender_from_answers(answers) or (user.gender if user else None)
+        age_years = _age_from_raw_date(user.dob, today)
+    gender = _gender_from_answers(entries) or (user.gender if user else None)
     maintenance = _estimate_maintenance_calories(
         weight_kg=current_weight,
         height_cm=height_cm,
@@ -153,68 +381,108 @@ def calculate_target_calories(session, user_id: int) -> tuple[int, int] | None:
         daily_delta = (abs(delta) * 7700) / timeframe_days
         target = maintenance + (daily_delta if delta > 0 else -daily_delta)
     target_calories = round(max(DEFAULT_BASE_CALORIES, target))
-
-    burned_calories = _todays_burned_calories(session, user_id, current_weight)
-    return target_calories, burned_calories
+    return target_calories, current_weight
 
 
 def _latest_weight_kg(session, user_id: int) -> float | None:
-    log = (
-        session.query(WeightLog)
+    return (
+        session.query(WeightLog.weight_kg)
         .filter(WeightLog.user_id == user_id)
         .order_by(WeightLog.logged_at.desc())
-        .first()
+        .limit(1)
+        .scalar()
     )
-    return log.weight_kg if log else None
 
 
 def _fetch_answers(session, user_id: int) -> list[UserAnswer]:
+    return _fetch_answers_for_users(session, [user_id])
+
+
+def _fetch_answers_for_users(session, user_ids: list[int]) -> list[UserAnswer]:
     return (
         session.query(UserAnswer)
         .join(Question, Question.id == UserAnswer.question_id)
         .options(
-            joinedload(UserAnswer.question),
-            joinedload(UserAnswer.selected_options).joinedload(UserAnswerOption.option),
+            # Reuse the filtering join rather than joining questions a second time.
+            contains_eager(UserAnswer.question).load_only(Question.question, Question.answer_type),
+            selectinload(UserAnswer.selected_options)
+            .joinedload(UserAnswerOption.option)
+            .load_only(AnswerOption.value, AnswerOption.option_text),
         )
-        .filter(UserAnswer.user_id == user_id)
-        .order_by(UserAnswer.created_at.desc())
+        .filter(UserAnswer.user_id.in_(user_ids), _relevant_question_clause())
+        .order_by(UserAnswer.user_id, UserAnswer.created_at.desc())
         .all()
     )
 
 
-def _find_answer_by_keywords(
-    answers: list[UserAnswer],
-    include: list[str],
-    exclude: list[str] | None = None,
-) -> UserAnswer | None:
+def _relevant_question_clause():
+    """Limit answers to questions some role or answer-type lookup can actually pick."""
+    question_text = func.lower(Question.question)
+    return or_(
+        func.lower(Question.answer_type).in_(_RELEVANT_ANSWER_TYPES),
+        *(
+            question_text.contains(keyword, autoescape=True)
+            for keywords in _QUESTION_ROLE_KEYWORDS.values()
+            for keyword in keywords
+        ),
+    )
+
+
+def _question_profile(question: Question) -> tuple[frozenset[str], str]:
+    """Return the question's keyword roles and lower-cased answer type."""
+    key = (question.question or "", question.answer_type or "")
+    profile = _question_profile_cache.get(key)
+    if profile is None:
+        question_text, answer_type = key
+        normalized = question_text.lower()
+        roles = frozenset(role for role, pattern in _QUESTION_ROLE_PATTERNS if pattern.search(normalized))
+        profile = (roles, answer_type.lower())
+        if len(_question_profile_cache) >= QUESTION_PROFILE_CACHE_MAX_ENTRIES:
+            _question_profile_cache.pop(next(iter(_question_profile_cache)))
+        _question_profile_cache[key] = profile
+    return profile
+
+
+def _normalize_answers(answers: list[UserAnswer]) -> list[tuple[UserAnswer, frozenset[str], str]]:
+    """Pair each answer with its question's roles and lower-cased answer type."""
+    entries = []
     for answer in answers:
-        question_text = (answer.question.question if answer.question else "").lower()
-        if not any(keyword in question_text for keyword in include):
-            continue
-        if exclude and any(keyword in question_text for keyword in exclude):
-            continue
-        return answer
+        question = answer.question
+        if question:
+            roles, answer_type = _question_profile(question)
+            entries.append((answer, roles, answer_type))
+        else:
+            entries.append((answer, frozenset(), ""))
+    return entries
+
+
+def _find_answer_with_role(
+    entries: list[tuple[UserAnswer, frozenset[str], str]],
+    role: str,
+) -> UserAnswer | None:
+    for answer, roles, _ in entries:
+        if role in roles:
+            return answer
     return None
 
 
-def _goal_weight_from_answers(answers: list[UserAnswer]) -> float | None:
-    answer = _find_answer_by_keywords(answers, include=["goal weight", "target weight"])
+def _goal_weight_from_answers(entries: list[tuple[UserAnswer, frozenset[str], str]]) -> float | None:
+    answer = _find_answer_with_role(entries, "goal_weight")
     if not answer:
         return None
     return weight_kg_from_answer(answer)
 
 
-def _current_weight_from_answers(answers: list[UserAnswer]) -> float | None:
-    answer = _find_answer_by_keywords(answers, include=["current weight"])
+def _current_weight_from_answers(entries: list[tuple[UserAnswer, frozenset[str], str]]) -> float | None:
+    answer = _find_answer_with_role(entries, "current_weight")
     if answer:
         parsed = weight_kg_from_answer(answer)
         if parsed is not None:
             return parsed
     weight_answers = [
         entry
-        for entry in answers
-        if (entry.question.answer_type if entry.question else "").lower() == "weight"
-        and not _question_contains(entry.question.question if entry.question else "", ["goal weight", "target weight"])
+        for entry, roles, answer_type in entries
+        if answer_type == "weight" and "goal_weight" not in roles
     ]
     for entry in weight_answers:
         parsed = weight_kg_from_answer(entry)
@@ -223,11 +491,8 @@ def _current_weight_from_answers(answers: list[UserAnswer]) -> float | None:
     return None
 
 
-def _goal_timeframe_days_from_answers(answers: list[UserAnswer]) -> int | None:
-    answer = _find_answer_by_keywords(
-        answers,
-        include=["week", "month", "time", "timeframe", "reach"],
-    )
+def _goal_timeframe_days_from_answers(entries: list[tuple[UserAnswer, frozenset[str], str]]) -> int | None:
+    answer = _find_answer_with_role(entries, "timeframe")
     if not answer:
         return None
     value = parse_numeric_value(answer.answer_text)
@@ -256,16 +521,9 @@ def _resolve_unit(answer: UserAnswer) -> str | None:
     return None
 
 
-def _question_contains(question: str, keywords: list[str]) -> bool:
-    normalized = question.lower()
-    return any(keyword in normalized for keyword in keywords)
-
-
-def _height_cm_from_answers(answers: list[UserAnswer]) -> float | None:
-    for entry in answers:
-        question = entry.question.question if entry.question else ""
-        answer_type = (entry.question.answer_type if entry.question else "").lower()
-        if answer_type != "height" and "height" not in question.lower():
+def _height_cm_from_answers(entries: list[tuple[UserAnswer, frozenset[str], str]]) -> float | None:
+    for entry, roles, answer_type in entries:
+        if answer_type != "height" and "height" not in roles:
             continue
         value = parse_numeric_value(entry.answer_text)
         if value is None:
@@ -278,16 +536,13 @@ def _height_cm_from_answers(answers: list[UserAnswer]) -> float | None:
     return None
 
 
-def _age_years_from_answers(answers: list[UserAnswer]) -> int | None:
-    answer = _find_answer_by_keywords(
-        answers,
-        include=["date of birth", "dob", "birth"],
-    )
+def _age_years_from_answers(entries: list[tuple[UserAnswer, frozenset[str], str]], today: date) -> int | None:
+    answer = _find_answer_with_role(entries, "birth_date")
     raw = answer.answer_text if answer else None
-    return _age_from_raw_date(raw)
+    return _age_from_raw_date(raw, today)
 
 
-def _age_from_raw_date(raw: str | None) -> int | None:
+def _age_from_raw_date(raw: str | None, today: date) -> int | None:
     if not raw or not raw.strip():
         return None
     parsed = None
@@ -298,19 +553,18 @@ def _age_from_raw_date(raw: str | None) -> int | None:
             parsed = datetime.fromisoformat(raw.strip()[:10])
         except ValueError:
             return None
-    return _age_from_date(parsed.date())
+    return _age_from_date(parsed.date(), today)
 
 
-def _age_from_date(dob: date) -> int | None:
-    today = date.today()
+def _age_from_date(dob: date, today: date) -> int | None:
     age = today.year - dob.year
     if (today.month, today.day) < (dob.month, dob.day):
         age -= 1
     return age if age >= 0 else None
 
 
-def _gender_from_answers(answers: list[UserAnswer]) -> str | None:
-    answer = _find_answer_by_keywords(answers, include=["gender"])
+def _gender_from_answers(entries: list[tuple[UserAnswer, frozenset[str], str]]) -> str | None:
+    answer = _find_answer_with_role(entries, "gender")
     if not answer:
         return None
     raw = None
@@ -352,32 +606,20 @@ def _estimate_maintenance_calories(
 
 
 def _gender_bmr_offset(gender: str | None) -> float:
-    normalized = (gender or "").strip().lower()
-    if normalized == "male":
-        return BMR_MALE_OFFSET
-    if normalized == "female":
-        return BMR_FEMALE_OFFSET
-    return 0
+    return _BMR_GENDER_OFFSETS.get((gender or "").strip().lower(), 0)
 
 
-def _todays_consumed_calories(session, user_id: int) -> float:
+def _todays_steps(session, user_id: int) -> int:
     today = date.today()
-    logs = (
-        session.query(FoodLog)
-        .filter(FoodLog.user_id == user_id, FoodLog.consumed_date == today)
-        .all()
+    steps = (
+        session.query(func.coalesce(func.sum(HealthStep.steps), 0))
+        .filter(HealthStep.user_id == user_id, HealthStep.step_date == today)
+        .scalar()
     )
-    return sum(log.calories or 0 for log in logs)
+    return steps or 0
 
 
-def _todays_burned_calories(session, user_id: int, weight_kg: float | None) -> int:
-    today = date.today()
-    step = (
-        session.query(HealthStep)
-        .filter(HealthStep.user_id == user_id, HealthStep.step_date == today)
-        .first()
-    )
-    steps = step.steps if step else 0
+def _burned_calories(steps: int, weight_kg: float | None) -> int:
     weight = max(weight_kg or REFERENCE_WEIGHT_KG, 1)
     return round(steps * CALORIES_PER_STEP * (weight / REFERENCE_WEIGHT_KG))
 
@@ -1,4 +1,4 @@
-from sqlalchemy import func, or_
+from sqlalchemy import exists, func, or_
 from sqlalchemy.orm import Session
 
 from app.constants import DEFAULT_ALL_GENDER_LABEL
@@ -29,10 +29,11 @@ def _pending_required_query(db: Session, user: User):
             )
         )
 
-    query = query.outerjoin(
-        UserAnswer,
-        (UserAnswer.question_id == Question.id) & (UserAnswer.user_id == user.id),
-    ).filter(UserAnswer.id.is_(None))
+    answered = exists().where(
+        UserAnswer.question_id == Question.id,
+        UserAnswer.user_id == user.id,
+    )
+    query = query.filter(~answered)
 
     return query
 
@@ -46,4 +47,4 @@ def get_pending_required_questions(db: Session, user: User):
 
 
 def count_pending_required_questions(db: Session, user: User) -> int:
-    return _pending_required_query(db, user).count()
+    return _pending_required_query(db, user).with_entities(func.count(Question.id)).scalar() or 0
@@ -1,9 +1,10 @@
-import random
+import secrets
 import string
 
 from app.models.user import User
 
 _REFERRAL_ALPHABET = string.ascii_uppercase + string.digits
+_REFERRAL_CANDIDATES = 16
 
 
 def normalize_referral_code(value: str | None) -> str | None:
@@ -13,14 +14,21 @@ def normalize_referral_code(value: str | None) -> str | None:
     return normalized or None
 
 
+def _random_code(length: int) -> str:
+    return "".join(secrets.choice(_REFERRAL_ALPHABET) for _ in range(length))
+
+
 def generate_referral_code(db, length: int = 6) -> str:
-    for _ in range(12):
-        code = "".join(random.choice(_REFERRAL_ALPHABET) for _ in range(length))
-        exists = db.query(User).filter(User.referral_code == code).first()
-        if not exists:
+    # Check a batch of candidates in one query instead of one query per attempt.
+    candidates = list(dict.fromkeys(_random_code(length) for _ in range(_REFERRAL_CANDIDATES)))
+    taken = {
+        code
+        for (code,) in db.query(User.referral_code).filter(User.referral_code.in_(candidates)).all()
+    }
+    for code in candidates:
+        if code not in taken:
             return code
-    suffix = "".join(random.choice(_REFERRAL_ALPHABET) for _ in range(8))
-    return f"SS{suffix}"
+    return f"SS{_random_code(8)}"
 
 
 def ensure_referral_code(db, user: User) -> str:
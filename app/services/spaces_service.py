@@ -1,6 +1,10 @@
 import boto3
+import logging
 import os
 import re
+import time
+
+logger = logging.getLogger(__name__)
 
 session = boto3.session.Session()
 
@@ -35,11 +39,25 @@ CATEGORY_MAP = {
     "freeworkout2": "SportNutrition",
 }
 
+# Every spelling that resolves without stripping punctuation, built once at import.
+_CATEGORY_LOOKUP = {
+    **{folder: folder for folder in CATEGORY_MAP.values()},
+    **{folder.lower(): folder for folder in CATEGORY_MAP.values()},
+    **CATEGORY_MAP,
+}
+_CATEGORY_STRIP_RE = re.compile(r"[^a-z0-9]")
+
+# Folder listings change only on upload, so serve repeat requests from memory.
+_VIDEO_LIST_TTL_SECONDS = 5 * 60
+_video_list_cache: dict[str, dict] = {}
+
 
 def normalize_category(cat: str):
     """Convert user category to correct folder name"""
-    key = re.sub(r"[^a-z0-9]", "", cat.lower())
-    return CATEGORY_MAP.get(key)
+    folder = _CATEGORY_LOOKUP.get(cat)
+    if folder is not None:
+        return folder
+    return CATEGORY_MAP.get(_CATEGORY_STRIP_RE.sub("", cat.lower()))
 
 
 def _join_path(*segments: str) -> str:
@@ -47,34 +65,41 @@ def _join_path(*segments: str) -> str:
     return "/".join(cleaned)
 
 
+def _list_category_videos(prefix: str) -> list[str]:
+    paginator = s3.get_paginator("list_objects_v2")
+    urls: list[str] = []
+    for page in paginator.paginate(Bucket=BUCKET, Prefix=prefix):
+        urls.extend(
+            f"{CDN_URL}/{obj['Key']}"
+            for obj in page.get("Contents", ())
+            if obj["Key"].lower().endswith(".mp4")
+        )
+    return urls
+
+
 def get_videos_by_category(category: str):
     real_category = normalize_category(category)
 
     if not real_category:
-        print("❌ Invalid category:", category)
+        logger.debug("Invalid video category: %s", category)
         return []
 
+    cached = _video_list_cache.get(real_category)
+    if cached and cached["expires_at"] > time.monotonic():
+        return list(cached["value"])
+
     prefix_root = _join_path(BASE_PATH, real_category)
     prefix = f"{prefix_root}/" if prefix_root else ""
 
-    print("📌 DEBUG PREFIX:", prefix)
+    urls = _list_category_videos(prefix)
+    if not urls:
+        logger.debug("No videos found under prefix %s", prefix)
 
-    response = s3.list_objects_v2(
-        Bucket=BUCKET,
-        Prefix=prefix
-    )
-
-    if "Contents" not in response:
-        print("⚠️ No files for:", prefix)
-        return []
-
-    urls = [
-        f"{CDN_URL}/{obj['Key']}"
-        for obj in response["Contents"]
-        if obj["Key"].lower().endswith(".mp4")
-    ]
-
-    return urls
+    _video_list_cache[real_category] = {
+        "value": urls,
+        "expires_at": time.monotonic() + _VIDEO_LIST_TTL_SECONDS,
+    }
+    return list(urls)
 
 
 def _upload_file(data: bytes, key: str, content_type: str | None = None) -> str:
@@ -101,7 +126,9 @@ def _build_key(body_part: str, filename: str, subfolder: str | None = None) -> s
 
 def upload_category_video(data: bytes, filename: str, body_part: str, content_type: str | None = None) -> str:
     key = _build_key(body_part, filename)
-    return _upload_file(data, key, content_type)
+    url = _upload_file(data, key, content_type)
+    _video_list_cache.pop(body_part.strip("/"), None)
+    return url
 
 
 def upload_category_thumbnail(data: bytes, filename: str, body_part: str, content_type: str | None = None) -> str:
@@ -1,7 +1,9 @@
 import asyncio
 import logging
 from collections import defaultdict
-from datetime import datetime
+from datetime import date, datetime
+
+from sqlalchemy import func
 
 from app.config import settings
 from app.database import SessionLocal
@@ -9,11 +11,13 @@ from app.models.progress_photo import ProgressPhoto
 from app.models.user import User
 from app.models.water import DeviceToken
 from app.models.weight import WeightLog
-from app.services.firebase_service import send_push_notification
+from app.services.firebase_service import delete_device_tokens, send_push_notification_async
+from app.utils.scheduler_lock import SchedulerLock
 
 logger = logging.getLogger(__name__)
 
 REMINDER_INTERVAL_DAYS = 7
+REMINDER_QUEUE_SIZE = 1000
 
 
 class TrackingReminderScheduler:
@@ -24,6 +28,7 @@ class TrackingReminderScheduler:
         self.enabled = enabled
         self._task: asyncio.Task | None = None
         self._stop_event = asyncio.Event()
+        self._lock = SchedulerLock("tracking_reminders")
 
     async def start(self) -> None:
         if not self.enabled:
@@ -32,7 +37,8 @@ class TrackingReminderScheduler:
         if self._task and not self._task.done():
             return
         logger.info("Starting tracking reminders every %s minutes", self.interval_seconds / 60)
-        self._stop_event.clear()
+        # A fresh event binds to the running loop, so a stopped scheduler can start on a new one.
+        self._stop_event = asyncio.Event()
         self._task = asyncio.create_task(self._run())
 
     async def stop(self) -> None:
@@ -41,121 +47,157 @@ class TrackingReminderScheduler:
         self._stop_event.set()
         await self._task
         self._task = None
+        await asyncio.to_thread(self._lock.release)
 
     async def _run(self) -> None:
         while not self._stop_event.is_set():
-            await self._send_reminders()
+            # Under multiple workers only the lock holder fans out pushes; checked every
+            # tick so another worker takes over if the holder's lock session drops.
+            if await asyncio.to_thread(self._lock.acquire):
+                await self._send_reminders()
             try:
                 await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval_seconds)
             except asyncio.TimeoutError:
                 continue
 
     async def _send_reminders(self) -> None:
-        session = SessionLocal()
+        # Queries and due-date math run in a worker thread; only the pushes run on the loop.
+        now, pending = await asyncio.to_thread(_collect_due_reminders)
+        if not pending:
+            return
+
+        sent_user_ids: dict[str, list[int]] = defaultdict(list)
+        invalid_tokens: list[str] = []
+        # A fixed pool of workers drains the queue so a large tick never has
+        # more than REMINDER_WORKERS pushes in flight.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=REMINDER_QUEUE_SIZE)
+
+        async def worker() -> None:
+            while True:
+                user_id, reminder_field, tokens, title, body, data = await queue.get()
+                try:
+                    result = await send_push_notification_async(tokens, title, body, data=data)
+                except Exception:
+                    logger.exception("Failed to send '%s' reminder for user %s", title, user_id)
+                else:
+                    invalid_tokens.extend(result.get("invalid_tokens") or [])
+                    sent_user_ids[reminder_field].append(user_id)
+                finally:
+                    queue.task_done()
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(max(settings.REMINDER_WORKERS, 1), len(pending)))
+        ]
         try:
-            token_rows = (
-                session.query(DeviceToken)
-                .join(User, User.id == DeviceToken.user_id)
-                .filter(User.is_active == True)
-                .all()
-            )
-            tokens_by_user: dict[int, list[str]] = defaultdict(list)
-            for token in token_rows:
-                tokens_by_user[token.user_id].append(token.token)
-
-            if not tokens_by_user:
-                logger.debug("Skipping tracking reminders; no device tokens registered.")
-                return
-
-            invalid_tokens: list[str] = []
-            now = datetime.utcnow()
-            for user_id, tokens in tokens_by_user.items():
-                user = session.query(User).filter(User.id == user_id).first()
-                if not user:
-                    continue
-
-                if _should_send_weight_reminder(session, user, now):
-                    try:
-                        result = send_push_notification(
-                            tokens,
-                            settings.WEIGHT_REMINDER_TITLE,
-                            settings.WEIGHT_REMINDER_BODY,
-                            data={"type": "weight_reminder", "source": "auto"},
-                        )
-                        invalid_tokens.extend(result.get("invalid_tokens") or [])
-                        user.last_weight_reminder_at = now
-                    except Exception:
-                        logger.exception("Failed to send weight reminder for user %s", user_id)
-
-                if _should_send_photo_reminder(session, user, now):
-                    try:
-                        result = send_push_notification(
-                            tokens,
-                            settings.PROGRESS_PHOTO_REMINDER_TITLE,
-                            settings.PROGRESS_PHOTO_REMINDER_BODY,
-                            data={"type": "progress_photo_reminder", "source": "auto"},
-                        )
-                        invalid_tokens.extend(result.get("invalid_tokens") or [])
-                        user.last_progress_photo_reminder_at = now
-                    except Exception:
-                        logger.exception(
-                            "Failed to send progress photo reminder for user %s",
-                            user_id,
-                        )
-
-            if invalid_tokens:
-                logger.info(
-                    "Tracking reminders removing %s invalid tokens",
-                    len(invalid_tokens),
-                )
-                session.query(DeviceToken).filter(DeviceToken.token.in_(invalid_tokens)).delete(
-                    synchronize_session=False
-                )
-            session.commit()
+            for item in pending:
+                await queue.put(item)
+            await queue.join()
         finally:
-            session.close()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        await asyncio.to_thread(_record_sent_reminders, sent_user_ids, invalid_tokens, now)
+
+
+def _collect_due_reminders() -> tuple[datetime, list[tuple[int, str, list[str], str, str, dict[str, str]]]]:
+    """Return the tick time and (user_id, reminder timestamp attribute, tokens, title, body, data) to send."""
+    now = datetime.utcnow()
+    session = SessionLocal()
+    try:
+        token_rows = (
+            session.query(DeviceToken.user_id, DeviceToken.token)
+            .join(User, User.id == DeviceToken.user_id)
+            .filter(User.is_active == True)
+            .all()
+        )
+        tokens_by_user: dict[int, list[str]] = defaultdict(list)
+        for user_id, token in token_rows:
+            tokens_by_user[user_id].append(token)
+
+        if not tokens_by_user:
+            logger.debug("Skipping tracking reminders; no device tokens registered.")
+            return now, []
+
+        # Identical for every user; the data dicts are shared and never mutated downstream.
+        weight_title = settings.WEIGHT_REMINDER_TITLE
+        weight_body = settings.WEIGHT_REMINDER_BODY
+        weight_data = {"type": "weight_reminder", "source": "auto"}
+        photo_title = settings.PROGRESS_PHOTO_REMINDER_TITLE
+        photo_body = settings.PROGRESS_PHOTO_REMINDER_BODY
+        photo_data = {"type": "progress_photo_reminder", "source": "auto"}
+
+        pending: list[tuple[int, str, list[str], str, str, dict[str, str]]] = []
+        user_ids = list(tokens_by_user)
+        users = {user.id: user for user in session.query(User).filter(User.id.in_(user_ids)).all()}
+        last_weight_logs = _latest_timestamps(session, WeightLog.user_id, WeightLog.logged_at, user_ids)
+        last_photos = _latest_timestamps(session, ProgressPhoto.user_id, ProgressPhoto.taken_at, user_ids)
+        today = now.date()
+        for user_id, tokens in tokens_by_user.items():
+            user = users.get(user_id)
+            if not user:
+                continue
 
+            if _is_reminder_due(last_weight_logs.get(user_id), user.last_weight_reminder_at, today):
+                pending.append(
+                    (user_id, "last_weight_reminder_at", tokens, weight_title, weight_body, weight_data)
+                )
 
-def _should_send_weight_reminder(session, user: User, now: datetime) -> bool:
-    last_log = (
-        session.query(WeightLog)
-        .filter(WeightLog.user_id == user.id)
-        .order_by(WeightLog.logged_at.desc())
-        .first()
-    )
-    return _is_reminder_due(
-        last_log.logged_at if last_log else None,
-        user.last_weight_reminder_at,
-        now,
-    )
+            if _is_reminder_due(last_photos.get(user_id), user.last_progress_photo_reminder_at, today):
+                pending.append(
+                    (user_id, "last_progress_photo_reminder_at", tokens, photo_title, photo_body, photo_data)
+                )
+        return now, pending
+    finally:
+        session.close()
 
 
-def _should_send_photo_reminder(session, user: User, now: datetime) -> bool:
-    last_photo = (
-        session.query(ProgressPhoto)
-        .filter(ProgressPhoto.user_id == user.id)
-        .order_by(ProgressPhoto.taken_at.desc())
-        .first()
-    )
-    return _is_reminder_due(
-        last_photo.taken_at if last_photo else None,
-        user.last_progress_photo_reminder_at,
-        now,
+def _record_sent_reminders(
+    sent_user_ids: dict[str, list[int]],
+    invalid_tokens: list[str],
+    now: datetime,
+) -> None:
+    session = SessionLocal()
+    try:
+        for reminder_field, user_ids in sent_user_ids.items():
+            session.query(User).filter(User.id.in_(user_ids)).update(
+                {getattr(User, reminder_field): now},
+                synchronize_session=False,
+            )
+        if invalid_tokens:
+            logger.info(
+                "Tracking reminders removing %s invalid tokens",
+                len(invalid_tokens),
+            )
+            delete_device_tokens(session, invalid_tokens)
+        session.commit()
+    finally:
+        session.close()
+
+
+def _latest_timestamps(session, user_column, timestamp_column, user_ids: list[int]) -> dict[int, datetime]:
+    rows = (
+        session.query(user_column, func.max(timestamp_column))
+        .filter(user_column.in_(user_ids))
+        .group_by(user_column)
+        .all()
     )
+    return {user_id: latest for user_id, latest in rows}
 
 
 def _is_reminder_due(
     last_log_at: datetime | None,
     last_reminder_at: datetime | None,
-    now: datetime,
+    today: date,
 ) -> bool:
     if last_log_at is None:
         return False
-    days_since_log = (now.date() - last_log_at.date()).days
+    days_since_log = (today - last_log_at.date()).days
     if days_since_log < REMINDER_INTERVAL_DAYS:
         return False
     if last_reminder_at and last_reminder_at >= last_log_at:
-        days_since_reminder = (now.date() - last_reminder_at.date()).days
+        days_since_reminder = (today - last_reminder_at.date()).days
         if days_since_reminder < REMINDER_INTERVAL_DAYS:
             return False
     return True
@@ -1,5 +1,6 @@
 import time
 import logging
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional
 
 import httpx
@@ -9,24 +10,57 @@ from app.config import settings
 USDA_BASE_URL = "https://api.nal.usda.gov/fdc/v1"
 DEFAULT_SEARCH_LIMIT = 25
 _CACHE_TTL_SECONDS = 60 * 60
-
-_search_cache: Dict[str, Dict[str, Any]] = {}
-_food_cache: Dict[int, Dict[str, Any]] = {}
+_SEARCH_CACHE_MAX_ENTRIES = 10_000
+_FOOD_CACHE_MAX_ENTRIES = 50_000
+
+_CALORIE_NUTRIENTS = ("energy", "energy (atwater general factors)")
+_PROTEIN_NUTRIENTS = ("protein",)
+_CARB_NUTRIENTS = ("carbohydrate, by difference",)
+_FAT_NUTRIENTS = ("total lipid (fat)",)
+
+# Least recently used entries sit at the front and are evicted first.
+_search_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_food_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+_client: httpx.AsyncClient | None = None
 logger = logging.getLogger(__name__)
 
 
-def _cache_get(cache: Dict[Any, Dict[str, Any]], key: Any) -> Optional[Any]:
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared client so USDA calls reuse pooled HTTP/2 connections."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            base_url=USDA_BASE_URL,
+            timeout=20,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _cache_get(cache: "OrderedDict[Any, Dict[str, Any]]", key: Any) -> Optional[Any]:
     entry = cache.get(key)
     if not entry:
         return None
-    if entry["expires_at"] < time.time():
+    if entry["expires_at"] < time.monotonic():
         cache.pop(key, None)
         return None
+    cache.move_to_end(key)
     return entry["value"]
 
 
-def _cache_set(cache: Dict[Any, Dict[str, Any]], key: Any, value: Any) -> None:
-    cache[key] = {"value": value, "expires_at": time.time() + _CACHE_TTL_SECONDS}
+def _cache_set(cache: "OrderedDict[Any, Dict[str, Any]]", key: Any, value: Any, max_entries: int) -> None:
+    cache[key] = {"value": value, "expires_at": time.monotonic() + _CACHE_TTL_SECONDS}
+    cache.move_to_end(key)
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
 
 
 def _normalize_query(value: str) -> str:
@@ -49,20 +83,20 @@ async def search_foods(query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Di
         "pageSize": limit,
         "api_key": api_key,
     }
-    async with httpx.AsyncClient(timeout=20) as client:
-        response = await client.get(f"{USDA_BASE_URL}/foods/search", params=params)
-        response.raise_for_status()
-        payload = response.json()
+    response = await _get_client().get("/foods/search", params=params)
+    response.raise_for_status()
+    payload = response.json()
 
     items = []
     for entry in payload.get("foods", [])[:limit]:
         food_category = entry.get("foodCategory")
         if isinstance(food_category, dict):
             food_category = food_category.get("description") or food_category.get("name")
-        calories = _extract_nutrient(entry, ["energy", "energy (atwater general factors)"]) or 0.0
-        protein = _extract_nutrient(entry, ["protein"]) or 0.0
-        carbs = _extract_nutrient(entry, ["carbohydrate, by difference"]) or 0.0
-        fat = _extract_nutrient(entry, ["total lipid (fat)"]) or 0.0
+        nutrients = _nutrient_map(entry)
+        calories = _extract_nutrient(nutrients, _CALORIE_NUTRIENTS) or 0.0
+        protein = _extract_nutrient(nutrients, _PROTEIN_NUTRIENTS) or 0.0
+        carbs = _extract_nutrient(nutrients, _CARB_NUTRIENTS) or 0.0
+        fat = _extract_nutrient(nutrients, _FAT_NUTRIENTS) or 0.0
         items.append(
             {
                 "fdcId": entry.get("fdcId"),
@@ -76,27 +110,36 @@ async def search_foods(query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Di
                 "fat": fat,
             }
         )
-    _cache_set(_search_cache, cache_key, items)
+    _cache_set(_search_cache, cache_key, items, _SEARCH_CACHE_MAX_ENTRIES)
     return items
 
 
-def _extract_nutrient(food: Dict[str, Any], names: List[str]) -> Optional[float]:
-    nutrients = food.get("foodNutrients") or []
-    for nutrient in nutrients:
-        name = nutrient.get("nutrientName") or nutrient.get("nutrient", {}).get("name")
+def _nutrient_map(food: Dict[str, Any]) -> Dict[str, tuple[int, Any]]:
+    """Map lower-cased nutrient names to (position, raw value) for the first entry with a value."""
+    nutrients: Dict[str, tuple[int, Any]] = {}
+    for position, nutrient in enumerate(food.get("foodNutrients") or []):
+        name = nutrient.get("nutrientName") or (nutrient.get("nutrient") or {}).get("name")
         if not name:
             continue
-        if name.lower() in names:
-            value = nutrient.get("amount")
-            if value is None:
-                value = nutrient.get("value")
-            if value is None:
-                continue
-            try:
-                return float(value)
-            except (TypeError, ValueError):
-                return None
-    return None
+        value = nutrient.get("amount")
+        if value is None:
+            value = nutrient.get("value")
+        if value is None:
+            continue
+        nutrients.setdefault(name.lower(), (position, value))
+    return nutrients
+
+
+def _extract_nutrient(nutrients: Dict[str, tuple[int, Any]], names: tuple[str, ...]) -> Optional[float]:
+    matches = [nutrients[name] for name in names if name in nutrients]
+    if not matches:
+        return None
+    # Whichever matching nutrient appears first in the payload wins.
+    _, value = min(matches, key=lambda match: match[0])
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 
 async def fetch_food(fdc_id: int) -> Dict[str, Any]:
@@ -108,15 +151,15 @@ async def fetch_food(fdc_id: int) -> Dict[str, Any]:
         return cached
 
     params = {"api_key": api_key}
-    async with httpx.AsyncClient(timeout=20) as client:
-        response = await client.get(f"{USDA_BASE_URL}/food/{fdc_id}", params=params)
-        response.raise_for_status()
-        food = response.json()
-
-    calories = _extract_nutrient(food, ["energy", "energy (atwater general factors)"])
-    protein = _extract_nutrient(food, ["protein"])
-    carbs = _extract_nutrient(food, ["carbohydrate, by difference"])
-    fat = _extract_nutrient(food, ["total lipid (fat)"])
+    response = await _get_client().get(f"/food/{fdc_id}", params=params)
+    response.raise_for_status()
+    food = response.json()
+
+    nutrients = _nutrient_map(food)
+    calories = _extract_nutrient(nutrients, _CALORIE_NUTRIENTS)
+    protein = _extract_nutrient(nutrients, _PROTEIN_NUTRIENTS)
+    carbs = _extract_nutrient(nutrients, _CARB_NUTRIENTS)
+    fat = _extract_nutrient(nutrients, _FAT_NUTRIENTS)
     if calories is None:
         logger.warning("USDA nutrient missing: calories for fdc_id=%s", fdc_id)
         calories = 0.0
@@ -140,5 +183,5 @@ async def fetch_food(fdc_id: int) -> Dict[str, Any]:
         "source": "USDA FoodData Central",
         "source_url": f"https://fdc.nal.usda.gov/fdc-app.html#/food-details/{fdc_id}/nutrients",
     }
-    _cache_set(_food_cache, fdc_id, normalized)
+    _cache_set(_food_cache, fdc_id, normalized, _FOOD_CACHE_MAX_ENTRIES)
     return normalized
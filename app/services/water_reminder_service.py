@@ -1,22 +1,45 @@
 import asyncio
 import logging
+from datetime import datetime, timedelta
+from typing import Sequence
+
+from sqlalchemy import func, or_, select, update
 
 from app.config import settings
-from app.database import SessionLocal
+from app.database import SessionLocal, engine
 from app.models.water import DeviceToken
-from app.services.firebase_service import send_push_notification
+from app.services.firebase_service import delete_device_tokens, send_push_notification_async
+from app.utils.scheduler_lock import SchedulerLock
 
 logger = logging.getLogger(__name__)
 
+TOKEN_FETCH_BATCH_SIZE = 5000
+
 
 class WaterReminderScheduler:
     """Background scheduler that periodically pushes water reminders."""
 
-    def __init__(self, interval_minutes: int, enabled: bool = True):
+    def __init__(self, interval_minutes: int, enabled: bool = True, dedupe_minutes: int = 0):
         self.interval_seconds = max(interval_minutes, 1) * 60
         self.enabled = enabled
+        # A token reminded within this window is skipped, e.g. right after a restart.
+        self.dedupe_window = timedelta(minutes=max(dedupe_minutes, 0))
+        # A window reaching the interval skips each token every other tick, so keep it a minute short.
+        max_window = timedelta(seconds=self.interval_seconds) - timedelta(minutes=1)
+        if self.dedupe_window > max_window:
+            logger.warning(
+                "Water reminder dedupe window of %s minutes is not below the %s minute interval; using %s",
+                dedupe_minutes,
+                self.interval_seconds // 60,
+                max_window,
+            )
+            self.dedupe_window = max_window
         self._task: asyncio.Task | None = None
         self._stop_event = asyncio.Event()
+        self._lock = SchedulerLock("water_reminders")
+        # Token -> last reminder time, reused while the table's (max id, row count) fingerprint is unchanged.
+        self._token_cache: dict[str, datetime | None] = {}
+        self._token_fingerprint: tuple[int, int] | None = None
 
     async def start(self) -> None:
         if not self.enabled:
@@ -25,7 +48,8 @@ class WaterReminderScheduler:
         if self._task and not self._task.done():
             return
         logger.info("Starting automatic water reminders every %s minutes", self.interval_seconds / 60)
-        self._stop_event.clear()
+        # A fresh event binds to the running loop, so a stopped scheduler can start on a new one.
+        self._stop_event = asyncio.Event()
         self._task = asyncio.create_task(self._run())
 
     async def stop(self) -> None:
@@ -34,23 +58,34 @@ class WaterReminderScheduler:
         self._stop_event.set()
         await self._task
         self._task = None
+        await asyncio.to_thread(self._lock.release)
 
     async def _run(self) -> None:
-        while not self._stop_event.is_set():
-            await self._send_reminder()
-            try:
-                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval_seconds)
-            except asyncio.TimeoutError:
-                continue
+        # One long-lived waiter: asyncio.wait returns on timeout instead of raising each tick.
+        stop_waiter = asyncio.create_task(self._stop_event.wait())
+        try:
+            while not self._stop_event.is_set():
+                # Under multiple workers only the lock holder fans out pushes; checked every
+                # tick so another worker takes over if the holder's lock session drops.
+                if await asyncio.to_thread(self._lock.acquire):
+                    await self._send_reminder()
+                await asyncio.wait({stop_waiter}, timeout=self.interval_seconds)
+        finally:
+            stop_waiter.cancel()
+
+    def invalidate_tokens(self) -> None:
+        self._token_fingerprint = None
 
     async def _send_reminder(self) -> None:
-        tokens = self._fetch_tokens()
+        # Database work is blocking, so keep it off the event loop.
+        now = datetime.utcnow()
+        tokens, max_token_id = await asyncio.to_thread(self._load_due_tokens, now)
         if not tokens:
-            logger.debug("Skipping automatic reminder; no device tokens registered.")
+            logger.debug("Skipping automatic reminder; no device tokens due.")
             return
         logger.info("Sending automatic water reminder to %s devices", len(tokens))
         try:
-            result = send_push_notification(
+            result = await send_push_notification_async(
                 tokens,
                 settings.WATER_REMINDER_TITLE,
                 settings.WATER_REMINDER_BODY,
@@ -61,30 +96,76 @@ class WaterReminderScheduler:
                 result.get("success"),
                 result.get("failure"),
             )
+            await asyncio.to_thread(self._mark_reminded, tokens, now, max_token_id)
             invalid_tokens = result.get("invalid_tokens") or []
             if invalid_tokens:
                 logger.info("Automatic reminder removing %s invalid tokens", len(invalid_tokens))
-                self._remove_tokens(invalid_tokens)
+                await asyncio.to_thread(self._remove_tokens, invalid_tokens)
         except Exception:
             logger.exception("Failed to send automatic water reminder")
 
+    def _load_due_tokens(self, now: datetime) -> tuple[tuple[str, ...], int]:
+        """Return tokens outside the dedupe window and the highest token id they were read under."""
+        # A bare pooled connection is enough for these reads; no ORM Session is needed per tick.
+        with engine.connect() as connection:
+            fingerprint = tuple(
+                connection.execute(
+                    select(func.coalesce(func.max(DeviceToken.id), 0), func.count(DeviceToken.id))
+                ).one()
+            )
+            if fingerprint != self._token_fingerprint:
+                # An empty table needs no second query.
+                self._token_cache = self._fetch_tokens(connection) if fingerprint[1] else {}
+                self._token_fingerprint = fingerprint
+        cutoff = now - self.dedupe_window
+        # A tuple keeps the snapshot compact for the duration of the send.
+        due = tuple(
+            token
+            for token, reminded_at in self._token_cache.items()
+            if reminded_at is None or reminded_at <= cutoff
+        )
+        return due, fingerprint[0]
+
     @staticmethod
-    def _fetch_tokens() -> list[str]:
+    def _fetch_tokens(connection) -> dict[str, datetime | None]:
+        # yield_per streams from a server-side cursor where the driver supports it.
+        stmt = select(DeviceToken.token, DeviceToken.last_reminder_at).execution_options(
+            yield_per=TOKEN_FETCH_BATCH_SIZE
+        )
+        return {token: reminded_at for token, reminded_at in connection.execute(stmt)}
+
+    def _mark_reminded(self, tokens: Sequence[str], now: datetime, max_token_id: int) -> None:
+        """Stamp the tokens just reminded; the due predicate stands in for a token IN list."""
+        cutoff = now - self.dedupe_window
         session = SessionLocal()
         try:
-            token_rows = session.query(DeviceToken.token).all()
-            return [token for (token,) in token_rows]
+            session.execute(
+                update(DeviceToken)
+                .where(
+                    DeviceToken.id <= max_token_id,
+                    or_(DeviceToken.last_reminder_at.is_(None), DeviceToken.last_reminder_at <= cutoff),
+                )
+                .values(last_reminder_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        except Exception:
+            logger.exception("Failed to record water reminder send time")
+            return
         finally:
             session.close()
+        for token in tokens:
+            if token in self._token_cache:
+                self._token_cache[token] = now
 
-    @staticmethod
-    def _remove_tokens(tokens: list[str]) -> None:
+    def _remove_tokens(self, tokens: list[str]) -> None:
         if not tokens:
             return
         session = SessionLocal()
         try:
-            session.query(DeviceToken).filter(DeviceToken.token.in_(tokens)).delete(synchronize_session=False)
+            delete_device_tokens(session, tokens)
             session.commit()
+            self.invalidate_tokens()
         except Exception:
             logger.exception("Failed to delete invalid device tokens")
         finally:
@@ -94,4 +175,10 @@ class WaterReminderScheduler:
 reminder_scheduler = WaterReminderScheduler(
     interval_minutes=settings.WATER_REMINDER_INTERVAL_MINUTES,
     enabled=settings.WATER_REMINDER_AUTO_ENABLED,
+    dedupe_minutes=settings.WATER_REMINDER_DEDUPE_MINUTES,
 )
+
+
+def invalidate_reminder_tokens() -> None:
+    """Drop the cached token snapshot after device tokens are added or removed."""
+    reminder_scheduler.invalidate_tokens()
@@ -1,87 +1,120 @@
-from datetime import date, datetime
+import time
+from datetime import date, datetime, timedelta
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session, contains_eager
 
 from app.models.question import AnswerOption, Question, UserAnswer, UserAnswerOption
 from app.models.user import User
 from app.models.weight import WeightLog
 from app.services.measurement_utils import weight_kg_from_answer
 
+_KG_ALIASES = frozenset({"kg", "kgs", "kilogram", "kilograms"})
+_QUESTION_CACHE_TTL_SECONDS = 300
+_WEIGHT_QUESTION_CACHE_KEY = "weight_question_id"
 
-def add_weight_log_from_answer(db: Session, user: User, answer: UserAnswer) -> Optional[WeightLog]:
+# Question id -> id of its kilogram answer option, shared by every weight sync.
+_kg_option_cache: dict[int, dict] = {}
+# The active weight question rarely changes; admin question edits drop it.
+_weight_question_cache: dict[str, dict] = {}
+
+
+def add_weight_log_from_answer(db: Session, user: User, answer: UserAnswer) -> bool:
+    """Record today's weight from an answer, replacing any log already made today."""
     weight_kg = weight_kg_from_answer(answer)
     if weight_kg is None or weight_kg <= 0:
-        return None
+        return False
 
     today = date.today()
     start_of_day = datetime.combine(today, datetime.min.time())
-    end_of_day = datetime.combine(today, datetime.max.time())
+    next_day = start_of_day + timedelta(days=1)
+    logged_at = answer.created_at or datetime.utcnow()
+    same_day = (
+        WeightLog.user_id == user.id,
+        WeightLog.logged_at >= start_of_day,
+        WeightLog.logged_at < next_day,
+    )
 
-    existing_log = (
-        db.query(WeightLog)
-        .filter(
-            WeightLog.user_id == user.id,
-            WeightLog.logged_at >= start_of_day,
-            WeightLog.logged_at <= end_of_day,
+    if db.get_bind().dialect.name == "postgresql":
+        # Update-or-insert in one statement; past days may hold several logs,
+        # so there is no unique key for ON CONFLICT to target.
+        updated = (
+            update(WeightLog)
+            .where(*same_day)
+            .values(weight_kg=weight_kg, logged_at=logged_at)
+            .returning(WeightLog.id)
+            .cte("updated")
         )
-        .first()
-    )
+        db.execute(
+            insert(WeightLog).from_select(
+                ["user_id", "weight_kg", "logged_at", "created_at"],
+                select(
+                    literal(user.id),
+                    literal(weight_kg),
+                    literal(logged_at),
+                    literal(datetime.utcnow()),
+                ).where(~exists(select(updated.c.id))),
+            )
+        )
+        return True
+
+    existing_log = db.query(WeightLog).filter(*same_day).first()
     if existing_log:
         existing_log.weight_kg = weight_kg
-        existing_log.logged_at = answer.created_at or datetime.utcnow()
-        return existing_log
+        existing_log.logged_at = logged_at
+        return True
 
-    log = WeightLog(
-        user_id=user.id,
-        weight_kg=weight_kg,
-        logged_at=answer.created_at or datetime.utcnow(),
-    )
-    db.add(log)
-    return log
+    db.execute(insert(WeightLog).values(user_id=user.id, weight_kg=weight_kg, logged_at=logged_at))
+    return True
 
 
 def sync_weight_answer_from_log(db: Session, user: User, weight_kg: float) -> Optional[UserAnswer]:
-    question = (
-        db.query(Question)
-        .filter(Question.answer_type == "weight", Question.is_active == True)
-        .order_by(Question.id.asc())
-        .first()
-    )
-    if not question:
+    question_id = _weight_question_id(db)
+    if question_id is None:
         return None
 
     answer = (
         db.query(UserAnswer)
-        .filter(UserAnswer.user_id == user.id, UserAnswer.question_id == question.id)
+        .filter(UserAnswer.user_id == user.id, UserAnswer.question_id == question_id)
         .order_by(UserAnswer.created_at.desc())
         .first()
     )
     now = datetime.utcnow()
     formatted_value = f"{weight_kg:.1f} kg"
+    kg_option_id = _kg_option_id(db, question_id)
     if answer:
         answer.answer_text = formatted_value
         answer.created_at = now
-        db.query(UserAnswerOption).filter(UserAnswerOption.user_answer_id == answer.id).delete()
+        selections = db.query(UserAnswerOption).filter(UserAnswerOption.user_answer_id == answer.id)
+        if not kg_option_id:
+            selections.delete()
+            return answer
+        # A weight answer holds a single unit selection, so repoint it in place.
+        updated = selections.update({UserAnswerOption.option_id: kg_option_id}, synchronize_session=False)
+        if updated > 1:
+            first_id = selections.with_entities(func.min(UserAnswerOption.id)).scalar_subquery()
+            selections.filter(UserAnswerOption.id != first_id).delete(synchronize_session=False)
+        if updated:
+            return answer
     else:
         answer = UserAnswer(
             user_id=user.id,
-            question_id=question.id,
+            question_id=question_id,
             answer_text=formatted_value,
             created_at=now,
         )
         db.add(answer)
         db.flush()
 
-    kg_option = _resolve_kg_option(question)
-    if kg_option:
-        db.add(UserAnswerOption(user_answer_id=answer.id, option_id=kg_option.id))
+    if kg_option_id:
+        db.add(UserAnswerOption(user_answer_id=answer.id, option_id=kg_option_id))
     return answer
 
 
 def resolve_starting_weight(db: Session, user: User) -> tuple[float, datetime] | None:
     earliest_log = (
-        db.query(WeightLog)
+        db.query(WeightLog.weight_kg, WeightLog.logged_at)
         .filter(WeightLog.user_id == user.id)
         .order_by(WeightLog.logged_at.asc())
         .first()
@@ -89,21 +122,15 @@ def resolve_starting_weight(db: Session, user: User) -> tuple[float, datetime] |
     if earliest_log:
         return earliest_log.weight_kg, earliest_log.logged_at
 
-    answers = (
-        db.query(UserAnswer)
-        .join(Question, UserAnswer.question_id == Question.id)
-        .filter(UserAnswer.user_id == user.id, Question.is_active == True)
-        .order_by(UserAnswer.created_at.asc())
-        .all()
-    )
-    current_answer = _find_weight_answer(answers, include=["current weight"])
+    current_answer = _first_weight_answer(db, user, include=["current weight"])
     if current_answer:
         parsed = weight_kg_from_answer(current_answer)
         if parsed is not None and parsed > 0:
             return parsed, current_answer.created_at
 
-    fallback_answer = _find_weight_answer(
-        answers,
+    fallback_answer = _first_weight_answer(
+        db,
+        user,
         include=[],
         exclude=["goal weight", "target weight"],
     )
@@ -114,33 +141,82 @@ def resolve_starting_weight(db: Session, user: User) -> tuple[float, datetime] |
     return None
 
 
-def _find_weight_answer(
-    answers: list[UserAnswer],
+def _first_weight_answer(
+    db: Session,
+    user: User,
     include: list[str],
     exclude: list[str] | None = None,
 ) -> Optional[UserAnswer]:
-    for answer in answers:
-        question = answer.question
-        if not question:
-            continue
-        question_text = question.question.lower()
-        if include and not any(keyword in question_text for keyword in include):
-            continue
-        if exclude and any(keyword in question_text for keyword in exclude):
-            continue
-        if question.answer_type.lower() != "weight":
-            continue
-        return answer
-    return None
+    """Return the user's earliest weight answer whose question text matches the keywords."""
+    question_text = func.lower(Question.question)
+    query = (
+        db.query(UserAnswer)
+        .join(Question, UserAnswer.question_id == Question.id)
+        .options(contains_eager(UserAnswer.question))
+        .filter(
+            UserAnswer.user_id == user.id,
+            Question.is_active == True,
+            func.lower(Question.answer_type) == "weight",
+        )
+    )
+    if include:
+        query = query.filter(or_(*(question_text.contains(keyword) for keyword in include)))
+    for keyword in exclude or []:
+        query = query.filter(~question_text.contains(keyword))
+    return query.order_by(UserAnswer.created_at.asc()).first()
+
+
+def invalidate_kg_option(question_id: int) -> None:
+    """Forget the cached kilogram option after a question's options change."""
+    _kg_option_cache.pop(question_id, None)
+
+
+def invalidate_weight_question() -> None:
+    """Forget the cached weight question after questions are created, edited or deleted."""
+    _weight_question_cache.pop(_WEIGHT_QUESTION_CACHE_KEY, None)
+
+
+def _weight_question_id(db: Session) -> Optional[int]:
+    entry = _weight_question_cache.get(_WEIGHT_QUESTION_CACHE_KEY)
+    if entry and entry["expires_at"] > time.monotonic():
+        return entry["value"]
+    question_id = db.scalar(
+        select(Question.id)
+        .where(Question.answer_type == "weight", Question.is_active == True)
+        .order_by(Question.id.asc())
+        .limit(1)
+    )
+    _weight_question_cache[_WEIGHT_QUESTION_CACHE_KEY] = {
+        "value": question_id,
+        "expires_at": time.monotonic() + _QUESTION_CACHE_TTL_SECONDS,
+    }
+    return question_id
+
+
+def _kg_option_id(db: Session, question_id: int) -> Optional[int]:
+    entry = _kg_option_cache.get(question_id)
+    if entry and entry["expires_at"] > time.monotonic():
+        return entry["value"]
+    option_rows = (
+        db.query(AnswerOption.id, AnswerOption.value, AnswerOption.option_text)
+        .filter(AnswerOption.question_id == question_id)
+        .order_by(AnswerOption.id.asc())
+        .all()
+    )
+    option_id = _match_kg_option(option_rows)
+    _kg_option_cache[question_id] = {
+        "value": option_id,
+        "expires_at": time.monotonic() + _QUESTION_CACHE_TTL_SECONDS,
+    }
+    return option_id
 
 
-def _resolve_kg_option(question: Question) -> Optional[AnswerOption]:
-    kg_aliases = {"kg", "kgs", "kilogram", "kilograms"}
-    for option in question.options or []:
-        for source in (option.value, option.option_text):
+def _match_kg_option(option_rows) -> Optional[int]:
+    for option_id, value, option_text in option_rows:
+        for source in (value, option_text):
             if not source:
                 continue
             normalized = source.strip().lower()
-            if normalized in kg_aliases or normalized.startswith("kg"):
-                return option
+            if normalized in _KG_ALIASES or normalized.startswith("kg"):
+                return option_id
     return None
@@ -0,0 +1,19 @@
+import re
+from datetime import datetime
+
+_ISO_DATETIME_RE = re.compile(
+    r"^\d{4}-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])"
+    r"([T ]([01]\d|2[0-3]):[0-5]\d(:[0-5]\d(\.\d{1,6})?)?"
+    r"(Z|[+-]([01]\d|2[0-3]):?[0-5]\d)?)?$"
+)
+
+
+def validate_iso_datetime(value: str) -> str:
+    """Check ISO-8601 syntax without building a datetime on the common path."""
+    match = _ISO_DATETIME_RE.match(value)
+    # Days past the 28th may not exist in the given month, and uncommon shapes
+    # are not covered by the regex; the full parser handles both and raises
+    # the precise ValueError.
+    if not match or match.group(2) > "28":
+        datetime.fromisoformat(value)
+    return value
@@ -1,31 +1,137 @@
-from sqlalchemy import inspect, text
-from sqlalchemy.engine import Engine
-
-
-def ensure_program_price_column(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "programs" not in inspector.get_table_names():
+import hashlib
+import logging
+import sqlite3
+from contextlib import contextmanager
+
+from sqlalchemy import MetaData, bindparam, event, inspect, text
+from sqlalchemy.engine import Engine, Inspector
+
+logger = logging.getLogger(__name__)
+
+# ALTER TABLE ... DROP COLUMN landed in SQLite 3.35.0.
+SQLITE_SUPPORTS_DROP_COLUMN = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+# Column types as (PostgreSQL, SQLite) where they differ.
+_BOOLEAN_FALSE = ("BOOLEAN DEFAULT FALSE", "BOOLEAN DEFAULT 0")
+_BOOLEAN_TRUE = ("BOOLEAN DEFAULT TRUE", "BOOLEAN DEFAULT 1")
+_TIMESTAMP = ("TIMESTAMP", "DATETIME")
+
+# table -> column -> type, for columns added to tables after they were first created.
+ADDED_COLUMNS: dict[str, dict[str, str | tuple[str, str]]] = {
+    "programs": {
+        "price_usd": "FLOAT",
+        "weekly_price_usd": "FLOAT",
+        "weekly_original_price_usd": "FLOAT",
+        "monthly_price_usd": "FLOAT",
+        "monthly_original_price_usd": "FLOAT",
+        "yearly_price_usd": "FLOAT",
+        "yearly_original_price_usd": "FLOAT",
+    },
+    "users": {
+        "has_pilates_board": _BOOLEAN_FALSE,
+        "has_ankle_wrist_weights": _BOOLEAN_FALSE,
+        "purchased_plan": _BOOLEAN_FALSE,
+        "has_library_access": _BOOLEAN_FALSE,
+        "health_data_acknowledged": _BOOLEAN_FALSE,
+        "daily_step_goal": "INTEGER DEFAULT 7000",
+        "daily_water_goal_ml": "INTEGER DEFAULT 4000",
+        "last_weight_reminder_at": _TIMESTAMP,
+        "last_progress_photo_reminder_at": _TIMESTAMP,
+        "target_calories_cached": "INTEGER",
+        "target_weight_kg_cached": ("DOUBLE PRECISION", "FLOAT"),
+        "target_cached_at": _TIMESTAMP,
+        "referral_code": "VARCHAR",
+        "referred_by_id": "INTEGER",
+        "referral_reward_sent": _BOOLEAN_FALSE,
+        "bmi_value": "DOUBLE PRECISION",
+        "bmi_category": "TEXT",
+    },
+    "device_tokens": {
+        "last_reminder_at": _TIMESTAMP,
+    },
+    "food_items": {
+        "serving_grams": "FLOAT",
+        "calories_per_100g": "FLOAT",
+        "protein_per_100g": "FLOAT",
+        "carbs_per_100g": "FLOAT",
+        "fat_per_100g": "FLOAT",
+        "default_serving_grams": "FLOAT",
+        "density_g_per_ml": "FLOAT",
+        "default_serving_ml": "FLOAT",
+        "source_item_id": "VARCHAR",
+        "food_type": "VARCHAR",
+        "default_serving_name": "VARCHAR",
+        "last_verified_at": _TIMESTAMP,
+        "fdc_id": "INTEGER",
+        "description": "TEXT",
+        "category_id": "INTEGER REFERENCES food_categories(id) ON DELETE SET NULL",
+        "is_active": _BOOLEAN_TRUE,
+    },
+    "food_logs": {
+        "meal_type": "TEXT",
+    },
+    "legal_links": {
+        "subscription_url": "VARCHAR",
+    },
+    "videos": {
+        "duration_seconds": "INTEGER",
+        "requires_payment": _BOOLEAN_FALSE,
+    },
+    "products": {
+        "link_url": "VARCHAR",
+    },
+}
+
+
+def _add_columns(connection, table: str, definitions: list[str]) -> None:
+    """Add columns given as "name TYPE [DEFAULT ...]"; Postgres takes them in one ALTER TABLE."""
+    if not definitions:
         return
-    columns = {column["name"] for column in inspector.get_columns("programs")}
-    pricing_columns = [
-        "price_usd",
-        "weekly_price_usd",
-        "weekly_original_price_usd",
-        "monthly_price_usd",
-        "monthly_original_price_usd",
-        "yearly_price_usd",
-        "yearly_original_price_usd",
-    ]
-    missing_columns = [column for column in pricing_columns if column not in columns]
-    if not missing_columns:
+    if connection.dialect.name == "postgresql":
+        clauses = ", ".join(f"ADD COLUMN IF NOT EXISTS {definition}" for definition in definitions)
+        connection.execute(text(f"ALTER TABLE {table} {clauses}"))
         return
-    with engine.begin() as connection:
-        for column in missing_columns:
-            connection.execute(text(f"ALTER TABLE programs ADD COLUMN {column} FLOAT"))
+    # SQLite accepts a single action per ALTER TABLE.
+    for definition in definitions:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {definition}"))
+
+
+def _rebuild_sqlite_table(engine: Engine, table: str, column_definitions: list[str]) -> None:
+    """Recreate ``table`` with only ``column_definitions``, keeping rows (SQLite's 12-step recipe).
+
+    Foreign keys are switched off around the transaction rather than deferred: with them on,
+    dropping the old table would fire ON DELETE actions (e.g. SET NULL) in child tables.
+    PRAGMA foreign_keys cannot change inside a transaction, and foreign_key_check runs
+    before commit so a bad copy rolls back.
+    """
+    columns = ", ".join(definition.split()[0] for definition in column_definitions)
+    new_table = f"{table}_new"
+    with engine.connect() as connection:
+        foreign_keys_enabled = connection.execute(text("PRAGMA foreign_keys")).scalar()
+        connection.commit()
+        connection.execute(text("PRAGMA foreign_keys=OFF"))
+        connection.commit()
+        try:
+            with connection.begin():
+                connection.execute(text(f"CREATE TABLE {new_table} ({', '.join(column_definitions)})"))
+                connection.execute(
+                    text(f"INSERT INTO {new_table} ({columns}) SELECT {columns} FROM {table}")
+                )
+                connection.execute(text(f"DROP TABLE {table}"))
+                # Renaming the new table leaves child references to ``table`` pointing at it.
+                connection.execute(text(f"ALTER TABLE {new_table} RENAME TO {table}"))
+                violations = connection.execute(text("PRAGMA foreign_key_check")).all()
+                if violations:
+                    raise RuntimeError(f"Rebuilding {table} broke foreign keys: {violations}")
+        finally:
+            if foreign_keys_enabled:
+                connection.execute(text("PRAGMA foreign_keys=ON"))
+                connection.commit()
 
 
-def drop_food_category_slug_and_sort(engine: Engine) -> None:
-    inspector = inspect(engine)
+def drop_food_category_slug_and_sort(engine: Engine, inspector: Inspector | None = None) -> None:
+    inspector = inspector or inspect(engine)
     if "food_categories" not in inspector.get_table_names():
         return
     columns = {column["name"] for column in inspector.get_columns("food_categories")}
@@ -33,352 +139,133 @@ def drop_food_category_slug_and_sort(engine: Engine) -> None:
     if not columns_to_drop:
         return
 
-    if engine.dialect.name == "sqlite":
-        try:
-            with engine.begin() as connection:
-                for column in columns_to_drop:
-                    connection.execute(text(f"ALTER TABLE food_categories DROP COLUMN {column}"))
-            return
-        except Exception:
-            pass
-
-        with engine.connect() as connection:
-            connection.execute(text("PRAGMA foreign_keys=OFF"))
-            trans = connection.begin()
-            try:
-                connection.execute(text("ALTER TABLE food_categories RENAME TO food_categories_old"))
-                connection.execute(
-                    text(
-                        "CREATE TABLE food_categories ("
-                        "id INTEGER PRIMARY KEY, "
-                        "name VARCHAR NOT NULL, "
-                        "description VARCHAR, "
-                        "is_active BOOLEAN NOT NULL DEFAULT 1, "
-                        "created_at DATETIME NOT NULL, "
-                        "updated_at DATETIME NOT NULL"
-                        ")"
-                    )
-                )
-                connection.execute(
-                    text(
-                        "INSERT INTO food_categories "
-                        "(id, name, description, is_active, created_at, updated_at) "
-                        "SELECT id, name, description, is_active, created_at, updated_at "
-                        "FROM food_categories_old"
-                    )
-                )
-                connection.execute(text("DROP TABLE food_categories_old"))
-                trans.commit()
-            except Exception:
-                trans.rollback()
-                raise
-            finally:
-                connection.execute(text("PRAGMA foreign_keys=ON"))
+    # An inline UNIQUE constraint cannot be dropped on SQLite, so such a table still needs a rebuild.
+    unique_columns = {
+        column
+        for constraint in inspector.get_unique_constraints("food_categories")
+        for column in constraint["column_names"]
+    }
+    needs_rebuild = not SQLITE_SUPPORTS_DROP_COLUMN or bool(unique_columns & set(columns_to_drop))
+    if engine.dialect.name == "sqlite" and needs_rebuild:
+        if not SQLITE_SUPPORTS_DROP_COLUMN:
+            logger.warning(
+                "SQLite %s lacks DROP COLUMN; rebuilding food_categories. "
+                "Upgrade to SQLite 3.35+ to avoid the table copy.",
+                sqlite3.sqlite_version,
+            )
+        _rebuild_sqlite_table(
+            engine,
+            "food_categories",
+            [
+                "id INTEGER PRIMARY KEY",
+                "name VARCHAR NOT NULL",
+                "description VARCHAR",
+                "is_active BOOLEAN NOT NULL DEFAULT 1",
+                "created_at DATETIME NOT NULL",
+                "updated_at DATETIME NOT NULL",
+            ],
+        )
         return
 
     with engine.begin() as connection:
-        for column in columns_to_drop:
-            connection.execute(text(f"ALTER TABLE food_categories DROP COLUMN {column}"))
-
-
-def ensure_user_flag_columns(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "users" not in inspector.get_table_names():
-        return
-
-    columns = {column["name"] for column in inspector.get_columns("users")}
-    flag_columns = [
-        "has_pilates_board",
-        "has_ankle_wrist_weights",
-        "purchased_plan",
-        "has_library_access",
-    ]
-
-    missing_columns = [column for column in flag_columns if column not in columns]
-    if not missing_columns:
-        return
+        if engine.dialect.name == "sqlite":
+            # SQLite refuses to drop an indexed column; Postgres drops such indexes itself.
+            for index in inspector.get_indexes("food_categories"):
+                if set(index["column_names"]) & set(columns_to_drop):
+                    connection.execute(text(f'DROP INDEX IF EXISTS "{index["name"]}"'))
+            # SQLite accepts a single action per ALTER TABLE.
+            for column in columns_to_drop:
+                connection.execute(text(f"ALTER TABLE food_categories DROP COLUMN {column}"))
+        else:
+            # Column names come from the fixed tuple above, never from input.
+            drops = ", ".join(f"DROP COLUMN {column}" for column in columns_to_drop)
+            connection.execute(text(f"ALTER TABLE food_categories {drops}"))
+
+
+def ensure_added_columns(engine: Engine, inspector: Inspector | None = None) -> None:
+    """Add any ADDED_COLUMNS entry missing from an existing table, one ALTER batch per table."""
+    inspector = inspector or inspect(engine)
+    tables = set(inspector.get_table_names())
+    type_index = 0 if engine.dialect.name == "postgresql" else 1
+    for table, column_types in ADDED_COLUMNS.items():
+        if table not in tables:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        definitions = [
+            f"{column} {column_type if isinstance(column_type, str) else column_type[type_index]}"
+            for column, column_type in column_types.items()
+            if column not in columns
+        ]
+        if not definitions:
+            continue
+        with engine.begin() as connection:
+            _add_columns(connection, table, definitions)
 
-    with engine.begin() as connection:
-        for column in missing_columns:
-            if engine.dialect.name == "postgresql":
-                connection.execute(
-                    text(
-                        f"""
-                        ALTER TABLE users
-                        ADD COLUMN IF NOT EXISTS {column} BOOLEAN DEFAULT FALSE
-                        """
-                    )
-                )
-            else:
-                # SQLite / others
-                connection.execute(
-                    text(
-                        f"""
-                        ALTER TABLE users
-                        ADD COLUMN {column} BOOLEAN DEFAULT 0
-                        """
-                    )
-                )
 
+# Recorded under a name tied to ADDED_COLUMNS, so adding an entry makes the step pending again.
+ensure_added_columns.migration_name = (
+    "ensure_added_columns:" + hashlib.sha1(repr(ADDED_COLUMNS).encode()).hexdigest()[:12]
+)
 
-def ensure_user_health_ack_column(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "users" not in inspector.get_table_names():
-        return
 
-    columns = {column["name"] for column in inspector.get_columns("users")}
-    if "health_data_acknowledged" in columns:
+def allow_null_food_item_barcode(engine: Engine, inspector: Inspector | None = None) -> None:
+    """Manual foods have no barcode; early food_items tables declared it NOT NULL."""
+    inspector = inspector or inspect(engine)
+    if "food_items" not in inspector.get_table_names():
         return
 
-    with engine.begin() as connection:
-        if engine.dialect.name == "postgresql":
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE users
-                    ADD COLUMN IF NOT EXISTS health_data_acknowledged BOOLEAN DEFAULT FALSE
-                    """
-                )
-            )
-        else:
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE users
-                    ADD COLUMN health_data_acknowledged BOOLEAN DEFAULT 0
-                    """
-                )
-            )
-
-
-def ensure_user_daily_goal_column(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "users" not in inspector.get_table_names():
+    barcode = next(
+        (column for column in inspector.get_columns("food_items") if column["name"] == "barcode"),
+        None,
+    )
+    if barcode is None or barcode["nullable"]:
         return
 
-    columns = {column["name"] for column in inspector.get_columns("users")}
-    if "daily_step_goal" in columns:
+    if engine.dialect.name != "postgresql":
+        # SQLite has no ALTER COLUMN; its tables come from create_all, which declares barcode nullable.
+        logger.warning("food_items.barcode is NOT NULL; rebuild the table to allow manual foods")
         return
-
     with engine.begin() as connection:
-        if engine.dialect.name == "postgresql":
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE users
-                    ADD COLUMN IF NOT EXISTS daily_step_goal INTEGER DEFAULT 7000
-                    """
-                )
-            )
-        else:
-            # SQLite / others
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE users
-                    ADD COLUMN daily_step_goal INTEGER DEFAULT 7000
-                    """
-                )
-            )
+        connection.execute(text("ALTER TABLE food_items ALTER COLUMN barcode DROP NOT NULL"))
 
 
-def ensure_user_daily_water_goal_column(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "users" not in inspector.get_table_names():
+def backfill_food_log_meal_type(engine: Engine, inspector: Inspector | None = None) -> None:
+    """Label food logs written before meal_type existed, once ensure_added_columns adds it."""
+    inspector = inspector or inspect(engine)
+    if "food_logs" not in inspector.get_table_names():
         return
-
-    columns = {column["name"] for column in inspector.get_columns("users")}
-    if "daily_water_goal_ml" in columns:
+    if "meal_type" not in {column["name"] for column in inspector.get_columns("food_logs")}:
         return
 
     with engine.begin() as connection:
-        if engine.dialect.name == "postgresql":
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE users
-                    ADD COLUMN IF NOT EXISTS daily_water_goal_ml INTEGER DEFAULT 4000
-                    """
-                )
-            )
-        else:
-            # SQLite / others
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE users
-                    ADD COLUMN daily_water_goal_ml INTEGER DEFAULT 4000
-                    """
-                )
-            )
         connection.execute(
-            text(
-                """
-                UPDATE users
-                SET daily_water_goal_ml = 4000
-                WHERE daily_water_goal_ml IS NULL
-                """
-            )
+            text("UPDATE food_logs SET meal_type = 'unspecified' WHERE meal_type IS NULL")
         )
 
 
-def ensure_user_tracking_reminder_columns(engine: Engine) -> None:
-    inspector = inspect(engine)
+def ensure_user_referral_code_index(engine: Engine, inspector: Inspector | None = None) -> None:
+    inspector = inspector or inspect(engine)
     if "users" not in inspector.get_table_names():
         return
 
-    columns = {column["name"] for column in inspector.get_columns("users")}
-    reminder_columns = [
-        "last_weight_reminder_at",
-        "last_progress_photo_reminder_at",
+    # Columns added by ensure_added_columns have no index; create_all builds a unique one.
+    unique_column_sets = [
+        index["column_names"] for index in inspector.get_indexes("users") if index.get("unique")
     ]
-    missing_columns = [column for column in reminder_columns if column not in columns]
-    if not missing_columns:
+    unique_column_sets.extend(
+        constraint["column_names"] for constraint in inspector.get_unique_constraints("users")
+    )
+    if ["referral_code"] in unique_column_sets:
         return
 
     with engine.begin() as connection:
-        for column in missing_columns:
-            if engine.dialect.name == "postgresql":
-                connection.execute(
-                    text(
-                        f"""
-                        ALTER TABLE users
-                        ADD COLUMN IF NOT EXISTS {column} TIMESTAMP
-                        """
-                    )
-                )
-            else:
-                connection.execute(
-                    text(
-                        f"""
-                        ALTER TABLE users
-                        ADD COLUMN {column} DATETIME
-                        """
-                    )
-                )
-
-
-def ensure_user_referral_columns(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "users" not in inspector.get_table_names():
-        return
-
-    columns = {column["name"] for column in inspector.get_columns("users")}
-    referral_columns = {
-        "referral_code": "VARCHAR",
-        "referred_by_id": "INTEGER",
-        "referral_reward_sent": "BOOLEAN",
-    }
-    missing_columns = {
-        column: dtype
-        for column, dtype in referral_columns.items()
-        if column not in columns
-    }
-    if not missing_columns:
-        return
-
-    with engine.begin() as connection:
-        for column, dtype in missing_columns.items():
-            if column == "referral_reward_sent":
-                if engine.dialect.name == "postgresql":
-                    connection.execute(
-                        text(
-                            f"""
-                            ALTER TABLE users
-                            ADD COLUMN IF NOT EXISTS {column} BOOLEAN DEFAULT FALSE
-                            """
-                        )
-                    )
-                else:
-                    connection.execute(
-                        text(
-                            f"""
-                            ALTER TABLE users
-                            ADD COLUMN {column} BOOLEAN DEFAULT 0
-                            """
-                        )
-                    )
-            else:
-                if engine.dialect.name == "postgresql":
-                    connection.execute(
-                        text(
-                            f"""
-                            ALTER TABLE users
-                            ADD COLUMN IF NOT EXISTS {column} {dtype}
-                            """
-                        )
-                    )
-                else:
-                    connection.execute(
-                        text(
-                            f"""
-                            ALTER TABLE users
-                            ADD COLUMN {column} {dtype}
-                            """
-                        )
-                    )
-
-
-def ensure_food_item_usda_columns(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "food_items" not in inspector.get_table_names():
-        return
-
-    columns = {column["name"] for column in inspector.get_columns("food_items")}
-    float_columns = [
-        "serving_grams",
-        "calories_per_100g",
-        "protein_per_100g",
-        "carbs_per_100g",
-        "fat_per_100g",
-        "default_serving_grams",
-        "density_g_per_ml",
-        "default_serving_ml",
-    ]
-    string_columns = ["source_item_id", "food_type", "default_serving_name"]
-    datetime_columns = ["last_verified_at"]
-    integer_columns = ["fdc_id"]
+        connection.execute(
+            text("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_referral_code ON users (referral_code)")
+        )
 
-    with engine.begin() as connection:
-        for column in float_columns:
-            if column in columns:
-                continue
-            if engine.dialect.name == "postgresql":
-                connection.execute(
-                    text(f"ALTER TABLE food_items ADD COLUMN IF NOT EXISTS {column} FLOAT")
-                )
-            else:
-                connection.execute(text(f"ALTER TABLE food_items ADD COLUMN {column} FLOAT"))
-        for column in string_columns:
-            if column in columns:
-                continue
-            if engine.dialect.name == "postgresql":
-                connection.execute(
-                    text(f"ALTER TABLE food_items ADD COLUMN IF NOT EXISTS {column} VARCHAR")
-                )
-            else:
-                connection.execute(text(f"ALTER TABLE food_items ADD COLUMN {column} VARCHAR"))
-        for column in datetime_columns:
-            if column in columns:
-                continue
-            if engine.dialect.name == "postgresql":
-                connection.execute(
-                    text(f"ALTER TABLE food_items ADD COLUMN IF NOT EXISTS {column} TIMESTAMP")
-                )
-            else:
-                connection.execute(text(f"ALTER TABLE food_items ADD COLUMN {column} DATETIME"))
-        for column in integer_columns:
-            if column in columns:
-                continue
-            if engine.dialect.name == "postgresql":
-                connection.execute(
-                    text(f"ALTER TABLE food_items ADD COLUMN IF NOT EXISTS {column} INTEGER")
-                )
-            else:
-                connection.execute(text(f"ALTER TABLE food_items ADD COLUMN {column} INTEGER"))
 
-def migrate_app_settings_to_legal_links(engine: Engine) -> None:
-    inspector = inspect(engine)
+def migrate_app_settings_to_legal_links(engine: Engine, inspector: Inspector | None = None) -> None:
+    inspector = inspector or inspect(engine)
     tables = inspector.get_table_names()
     if "legal_links" not in tables and "app_settings" not in tables:
         return
@@ -405,43 +292,45 @@ def migrate_app_settings_to_legal_links(engine: Engine) -> None:
                 pass
 
 
-def ensure_legal_links_subscription_column(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "legal_links" not in inspector.get_table_names():
+def drop_products_key_column(engine: Engine, inspector: Inspector | None = None) -> None:
+    inspector = inspector or inspect(engine)
+    if "products" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("products")}
+    if "key" not in columns:
         return
 
-    columns = {column["name"] for column in inspector.get_columns("legal_links")}
-    if "subscription_url" in columns:
+    if engine.dialect.name == "sqlite":
+        _rebuild_sqlite_table(
+            engine,
+            "products",
+            [
+                "id INTEGER PRIMARY KEY",
+                "title VARCHAR NOT NULL",
+                "subtitle VARCHAR",
+                "badge_text VARCHAR",
+                "description TEXT",
+                "image_url VARCHAR",
+                "link_url VARCHAR",
+                "is_active BOOLEAN NOT NULL DEFAULT 1",
+                "sort_order INTEGER NOT NULL DEFAULT 0",
+                "created_at DATETIME NOT NULL",
+                "updated_at DATETIME NOT NULL",
+            ],
+        )
         return
 
     with engine.begin() as connection:
-        if engine.dialect.name == "postgresql":
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE legal_links
-                    ADD COLUMN IF NOT EXISTS subscription_url VARCHAR
-                    """
-                )
-            )
-        else:
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE legal_links
-                    ADD COLUMN subscription_url VARCHAR
-                    """
-                )
-            )
+        connection.execute(text("ALTER TABLE products DROP COLUMN IF EXISTS key"))
 
 
-def ensure_video_duration_column(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "videos" not in inspector.get_table_names():
+def ensure_water_logged_date_column(engine: Engine, inspector: Inspector | None = None) -> None:
+    inspector = inspector or inspect(engine)
+    if "water_logs" not in inspector.get_table_names():
         return
 
-    columns = {column["name"] for column in inspector.get_columns("videos")}
-    if "duration_seconds" in columns:
+    columns = {column["name"] for column in inspector.get_columns("water_logs")}
+    if "logged_date" in columns:
         return
 
     with engine.begin() as connection:
@@ -449,130 +338,262 @@ def ensure_video_duration_column(engine: Engine) -> None:
             connection.execute(
                 text(
                     """
-                    ALTER TABLE videos
-                    ADD COLUMN IF NOT EXISTS duration_seconds INTEGER
+                    ALTER TABLE water_logs
+                    ADD COLUMN IF NOT EXISTS logged_date DATE
+                    GENERATED ALWAYS AS (date(logged_at)) STORED
                     """
                 )
             )
         else:
+            # SQLite cannot add STORED generated columns to an existing table.
             connection.execute(
                 text(
                     """
-                    ALTER TABLE videos
-                    ADD COLUMN duration_seconds INTEGER
+                    ALTER TABLE water_logs
+                    ADD COLUMN logged_date DATE
+                    GENERATED ALWAYS AS (date(logged_at)) VIRTUAL
                     """
                 )
             )
 
 
-def ensure_video_payment_column(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "videos" not in inspector.get_table_names():
+def ensure_analytics_covering_indexes(engine: Engine, inspector: Inspector | None = None) -> None:
+    inspector = inspector or inspect(engine)
+    tables = inspector.get_table_names()
+    index_specs = [
+        ("water_logs", "ix_water_logs_user_logged_at", "user_id, logged_at", "amount_ml"),
+        ("water_logs", "ix_water_logs_user_logged_date", "user_id, logged_date", "amount_ml"),
+        ("health_steps", "ix_health_steps_user_step_date", "user_id, step_date", "steps"),
+        ("weight_logs", "ix_weight_logs_user_logged_at", "user_id, logged_at", "weight_kg"),
+        (
+            "food_logs",
+            "ix_food_logs_user_consumed_date",
+            "user_id, consumed_date",
+            "calories, protein, carbs, fat",
+        ),
+    ]
+    index_specs = [spec for spec in index_specs if spec[0] in tables]
+    missing_indexes = []
+    for table, index_name, key_columns, include_columns in index_specs:
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if index_name in existing:
+            continue
+        missing_indexes.append((table, index_name, key_columns, include_columns))
+
+    if engine.dialect.name == "postgresql":
+        index_names = [index_name for _, index_name, _, _ in index_specs]
+        # CONCURRENTLY cannot run inside a transaction block.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            # A failed or interrupted CONCURRENTLY build leaves an INVALID index under the
+            # name, which IF NOT EXISTS (and reflection) would otherwise accept as done.
+            invalid = _invalid_indexes(connection, index_names)
+            for index_name in invalid:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+            missing_indexes.extend(spec for spec in index_specs if spec[1] in invalid)
+            for table, index_name, key_columns, include_columns in missing_indexes:
+                connection.execute(
+                    text(
+                        f"""
+                        CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name}
+                        ON {table} ({key_columns}) INCLUDE ({include_columns})
+                        """
+                    )
+                )
+            # Raising leaves the step unrecorded, so the next boot repairs it.
+            still_invalid = _invalid_indexes(connection, index_names)
+            if still_invalid:
+                raise RuntimeError(f"Covering indexes left invalid: {', '.join(sorted(still_invalid))}")
         return
 
-    columns = {column["name"] for column in inspector.get_columns("videos")}
-    if "requires_payment" in columns:
+    if not missing_indexes:
         return
 
     with engine.begin() as connection:
-        if engine.dialect.name == "postgresql":
+        for table, index_name, key_columns, _ in missing_indexes:
             connection.execute(
-                text(
-                    """
-                    ALTER TABLE videos
-                    ADD COLUMN IF NOT EXISTS requires_payment BOOLEAN DEFAULT FALSE
-                    """
-                )
-            )
-        else:
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE videos
-                    ADD COLUMN requires_payment BOOLEAN DEFAULT 0
-                    """
-                )
+                text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({key_columns})")
             )
 
 
-def drop_products_key_column(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "products" not in inspector.get_table_names():
-        return
-    columns = {column["name"] for column in inspector.get_columns("products")}
-    if "key" not in columns:
+# Renamed so deployments that recorded the step before invalid-index cleanup re-check once.
+ensure_analytics_covering_indexes.migration_name = "ensure_analytics_covering_indexes:valid"
+
+
+def _invalid_indexes(connection, index_names: list[str]) -> set[str]:
+    """Names among index_names whose Postgres index is marked INVALID."""
+    if not index_names:
+        return set()
+    rows = connection.execute(
+        text(
+            """
+            SELECT c.relname FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE NOT i.indisvalid AND c.relname IN :names
+            """
+        ).bindparams(bindparam("names", expanding=True)),
+        {"names": index_names},
+    )
+    return set(rows.scalars())
+
+
+def ensure_user_answer_lookup_index(engine: Engine, inspector: Inspector | None = None) -> None:
+    inspector = inspector or inspect(engine)
+    if "user_answers" not in inspector.get_table_names():
         return
 
-    if engine.dialect.name == "sqlite":
-        with engine.connect() as connection:
-            connection.execute(text("PRAGMA foreign_keys=OFF"))
-            trans = connection.begin()
-            try:
-                connection.execute(text("ALTER TABLE products RENAME TO products_old"))
-                connection.execute(
-                    text(
-                        "CREATE TABLE products ("
-                        "id INTEGER PRIMARY KEY, "
-                        "title VARCHAR NOT NULL, "
-                        "subtitle VARCHAR, "
-                        "badge_text VARCHAR, "
-                        "description TEXT, "
-                        "image_url VARCHAR, "
-                        "link_url VARCHAR, "
-                        "is_active BOOLEAN NOT NULL DEFAULT 1, "
-                        "sort_order INTEGER NOT NULL DEFAULT 0, "
-                        "created_at DATETIME NOT NULL, "
-                        "updated_at DATETIME NOT NULL"
-                        ")"
-                    )
-                )
-                connection.execute(
-                    text(
-                        "INSERT INTO products "
-                        "(id, title, subtitle, badge_text, description, image_url, link_url, "
-                        "is_active, sort_order, created_at, updated_at) "
-                        "SELECT id, title, subtitle, badge_text, description, image_url, link_url, "
-                        "is_active, sort_order, created_at, updated_at "
-                        "FROM products_old"
-                    )
-                )
-                connection.execute(text("DROP TABLE products_old"))
-                trans.commit()
-            except Exception:
-                trans.rollback()
-                raise
-            finally:
-                connection.execute(text("PRAGMA foreign_keys=ON"))
+    existing = {index["name"] for index in inspector.get_indexes("user_answers")}
+    if "ix_user_answers_user_question" in existing:
         return
 
     with engine.begin() as connection:
-        connection.execute(text("ALTER TABLE products DROP COLUMN IF EXISTS key"))
+        connection.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_user_answers_user_question "
+                "ON user_answers (user_id, question_id)"
+            )
+        )
 
 
-def ensure_product_link_column(engine: Engine) -> None:
-    inspector = inspect(engine)
-    if "products" not in inspector.get_table_names():
-        return
-    columns = {column["name"] for column in inspector.get_columns("products")}
-    if "link_url" in columns:
+def ensure_lowercase_lookup_indexes(engine: Engine, inspector: Inspector | None = None) -> None:
+    inspector = inspector or inspect(engine)
+    tables = inspector.get_table_names()
+    index_specs = [
+        ("food_categories", "ix_food_categories_lower_name", "name"),
+        ("food_items", "ix_food_items_lower_product_name", "product_name"),
+        ("meal_configs", "ix_meal_configs_lower_key", "key"),
+    ]
+    present_specs = [spec for spec in index_specs if spec[0] in tables]
+    if not present_specs:
         return
 
+    # SQLite reflection skips expression indexes, so rely on IF NOT EXISTS rather than get_indexes().
+    # Postgres and SQLite both index lower(column); MySQL would need a generated column instead.
     with engine.begin() as connection:
-        if engine.dialect.name == "postgresql":
+        for table, index_name, column in present_specs:
             connection.execute(
-                text(
-                    """
-                    ALTER TABLE products
-                    ADD COLUMN IF NOT EXISTS link_url VARCHAR
-                    """
-                )
+                text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} (lower({column}))")
             )
-        else:
-            connection.execute(
-                text(
-                    """
-                    ALTER TABLE products
-                    ADD COLUMN link_url VARCHAR
-                    """
-                )
+
+
+# Applied in order at startup; later steps may rely on tables or columns earlier ones create.
+STARTUP_MIGRATIONS = (
+    drop_food_category_slug_and_sort,
+    migrate_app_settings_to_legal_links,
+    drop_products_key_column,
+    ensure_added_columns,
+    allow_null_food_item_barcode,
+    backfill_food_log_meal_type,
+    ensure_user_referral_code_index,
+    ensure_water_logged_date_column,
+    ensure_analytics_covering_indexes,
+    ensure_user_answer_lookup_index,
+    ensure_lowercase_lookup_indexes,
+)
+
+
+def create_missing_tables(engine: Engine, metadata: MetaData) -> None:
+    """create_all for tables that do not exist yet, found with one table listing.
+
+    create_all(checkfirst=True) issues a has_table probe per model on every boot.
+    """
+    existing = set(inspect(engine).get_table_names())
+    missing = [table for table in metadata.sorted_tables if table.name not in existing]
+    if missing:
+        metadata.create_all(bind=engine, tables=missing, checkfirst=False)
+
+
+SCHEMA_MIGRATIONS_TABLE = "schema_migrations"
+
+
+def _applied_migrations(engine: Engine) -> set[str]:
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {SCHEMA_MIGRATIONS_TABLE} "
+                "(name VARCHAR(255) PRIMARY KEY)"
             )
+        )
+        return set(connection.execute(text(f"SELECT name FROM {SCHEMA_MIGRATIONS_TABLE}")).scalars())
+
+
+def _record_migrations(engine: Engine, names: list[str]) -> None:
+    if not names:
+        return
+    with engine.begin() as connection:
+        connection.execute(
+            # Another worker may have recorded the same step; Postgres and SQLite 3.24+ both accept this.
+            text(
+                f"INSERT INTO {SCHEMA_MIGRATIONS_TABLE} (name) VALUES (:name) "
+                "ON CONFLICT (name) DO NOTHING"
+            ),
+            [{"name": name} for name in names],
+        )
+
+
+def _migration_name(migration) -> str:
+    return getattr(migration, "migration_name", migration.__name__)
+
+
+# Arbitrary constant shared by every worker; pg_advisory_lock takes a bigint key.
+_MIGRATIONS_LOCK_KEY = 0x4D494752
+
+
+@contextmanager
+def _migrations_lock(engine: Engine):
+    """Hold a Postgres advisory lock so only one worker applies migrations at a time.
+
+    Workers that wait then read ``schema_migrations`` after the holder recorded its steps.
+    Other dialects have no cross-process lock here and run single-process.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _MIGRATIONS_LOCK_KEY})
+        # Leave no open transaction behind while the session holds the lock.
+        connection.commit()
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _MIGRATIONS_LOCK_KEY})
+            connection.commit()
+
+
+def run_startup_migrations(engine: Engine) -> None:
+    """Apply pending STARTUP_MIGRATIONS in order, sharing one schema inspector between them.
+
+    Completed steps are recorded by name in ``schema_migrations`` and skipped on later
+    boots, so changing what an existing step does needs a new step instead.
+    """
+    with _migrations_lock(engine):
+        _run_pending_migrations(engine)
+
+
+def _run_pending_migrations(engine: Engine) -> None:
+    applied = _applied_migrations(engine)
+    pending = [
+        migration for migration in STARTUP_MIGRATIONS if _migration_name(migration) not in applied
+    ]
+    if not pending:
+        return
+
+    inspector = inspect(engine)
+    schema_changed = False
+
+    def _mark_changed(_connection) -> None:
+        nonlocal schema_changed
+        schema_changed = True
+
+    # Reflection never commits, so a commit means a step changed the schema or data.
+    event.listen(engine, "commit", _mark_changed)
+    completed: list[str] = []
+    try:
+        for migration in pending:
+            migration(engine, inspector)
+            completed.append(_migration_name(migration))
+            if schema_changed:
+                inspector.clear_cache()
+                schema_changed = False
+    finally:
+        event.remove(engine, "commit", _mark_changed)
+        _record_migrations(engine, completed)
@@ -1,11 +1,21 @@
 import logging
+from typing import Any
 
+import orjson
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
 logger = logging.getLogger(__name__)
 
+
+class _EnvelopeResponse(JSONResponse):
+    """Serialize in one orjson pass; types orjson lacks (models, Decimal, sets) go through jsonable_encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+
 def create_response(
     message: str,
     data=None,
@@ -14,12 +24,11 @@ def create_response(
 ) -> JSONResponse:
     """Return a consistent API response payload and status code."""
     payload_status = status_text or ("success" if status_code < 400 else "error")
-    encoded_data = jsonable_encoder(data)
-    return JSONResponse(
+    return _EnvelopeResponse(
         status_code=status_code,
         content={
             "message": message,
-            "data": encoded_data,
+            "data": data,
             "status": payload_status,
             "status_code": status_code,
         },
@@ -0,0 +1,83 @@
+import logging
+import zlib
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+def _lock_key(name: str) -> int:
+    # Stable across processes, unlike hash(), so every worker asks for the same lock.
+    return zlib.crc32(f"scheduler:{name}".encode())
+
+
+class SchedulerLock:
+    """Session-level Postgres advisory lock electing one worker to run a scheduler.
+
+    Schedulers call acquire() on every tick: the holder confirms its lock session is
+    still alive, and the other workers retry, so leadership moves on if it drops.
+    Other dialects have no cross-process lock here and always report leadership,
+    which matches single-process local runs.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._connection: Connection | None = None
+
+    def acquire(self) -> bool:
+        if engine.dialect.name != "postgresql":
+            return True
+        if self._connection is not None:
+            if self._still_held():
+                return True
+            logger.warning("Lost scheduler lock %s; trying to take it again", self.name)
+        connection = None
+        try:
+            connection = engine.connect()
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": _lock_key(self.name)}
+            ).scalar()
+            # Leave no open transaction behind while the connection holds the lock.
+            connection.commit()
+        except Exception:
+            # Called every tick; an unreachable database means no leader this tick, not a dead loop.
+            logger.exception("Failed to acquire scheduler lock %s", self.name)
+            if connection is not None:
+                connection.close()
+            return False
+        if not acquired:
+            connection.close()
+            return False
+        logger.info("Acquired scheduler lock %s", self.name)
+        self._connection = connection
+        return True
+
+    def _still_held(self) -> bool:
+        """Probe the lock session; Postgres frees the lock when that session ends."""
+        connection = self._connection
+        try:
+            connection.execute(text("SELECT 1"))
+            connection.commit()
+            return True
+        except Exception:
+            self._connection = None
+            try:
+                connection.close()
+            except Exception:
+                pass
+            return False
+
+    def release(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _lock_key(self.name)})
+            connection.commit()
+        except Exception:
+            logger.exception("Failed to release scheduler lock %s", self.name)
+        finally:
+            connection.close()
@@ -1,14 +1,23 @@
+import hashlib
+import importlib
 import os
+import pkgutil
+
 from dotenv import load_dotenv
-from sqlalchemy import inspect, text, func
+from sqlalchemy import and_, case, exists, func, insert, literal, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
 
 from app.database import Base, engine, SessionLocal
+from app.utils.db_migrations import create_missing_tables, run_startup_migrations
 from app.models.user import User
 from app.models.program import Program, ProgramDay
 from app.models.nutrition import FoodCategory, FoodItem, FoodLog, MealConfig
 from app.models.exercise_library import ExerciseLibraryItem
 from app.models.question import Question, AnswerOption
 
+
 FREE_WEEK_TEMPLATE = [
     {
         "title": "Full Body Ignite",
@@ -113,22 +122,22 @@ PREMIUM_WEEK_TEMPLATE = [
     FREE_WEEK_TEMPLATE[6],  # Complete rest reused
 ]
 
-DEFAULT_FOOD_CATEGORIES = [
+DEFAULT_FOOD_CATEGORIES = (
     {"name": "Fruits", "description": "Fresh fruits and berries."},
     {"name": "Vegetables", "description": "Leafy greens and veggies."},
     {"name": "Proteins", "description": "Lean protein sources."},
     {"name": "Grains", "description": "Whole grains and carbs."},
     {"name": "Snacks", "description": "Quick bites."},
-]
+)
 
-DEFAULT_EXERCISE_LIBRARY_ITEMS = [
+DEFAULT_EXERCISE_LIBRARY_ITEMS = (
     {"slug": "Core", "title": "Core", "sort_order": 1},
     {"slug": "Arms", "title": "Arm", "sort_order": 2},
     {"slug": "Legs", "title": "Legs", "sort_order": 3},
     {"slug": "FullBody", "title": "Full Body", "sort_order": 4},
-]
+)
 
-DEFAULT_MEALS = [
+DEFAULT_MEALS = (
     {
         "key": "breakfast",
         "name": "Breakfast",
@@ -157,9 +166,9 @@ DEFAULT_MEALS = [
         "max_ratio": 0.08,
         "sort_order": 4,
     },
-]
+)
 
-DEFAULT_GOAL_QUESTIONS = [
+DEFAULT_GOAL_QUESTIONS = (
     {
         "question": "What is your gender?",
         "description": "Select the gender that best describes you.",
@@ -217,122 +226,59 @@ DEFAULT_GOAL_QUESTIONS = [
             {"option_text": "Months", "value": "months"},
         ],
     },
-]
+)
 
-DEFAULT_FOODS = []
+DEFAULT_FOODS = ()
 
 # Load environment variables
 load_dotenv()
 
-# Ensure all tables exist
-Base.metadata.create_all(bind=engine)
-
-
-def _ensure_bmi_columns():
-    """Add new BMI columns for legacy databases that predate the schema change."""
-    inspector = inspect(engine)
-    column_names = {col["name"] for col in inspector.get_columns("users")}
-    statements = []
-    if "bmi_value" not in column_names:
-        statements.append("ALTER TABLE users ADD COLUMN bmi_value DOUBLE PRECISION")
-    if "bmi_category" not in column_names:
-        statements.append("ALTER TABLE users ADD COLUMN bmi_category TEXT")
-    if not statements:
-        return
-    with engine.begin() as connection:
-        for statement in statements:
-            connection.execute(text(statement))
-            print(f"✔ Applied migration: {statement}")
-
-
-_ensure_bmi_columns()
-
-
-def _ensure_food_schema():
-    inspector = inspect(engine)
-    tables = inspector.get_table_names()
-    if "food_categories" not in tables:
-        FoodCategory.__table__.create(engine)
-        print("✔ Created food_categories table")
-
-    statements = []
-    food_columns = {col["name"] for col in inspector.get_columns("food_items")}
-    if "description" not in food_columns:
-        statements.append("ALTER TABLE food_items ADD COLUMN description TEXT")
-    if "category_id" not in food_columns:
-        statements.append("ALTER TABLE food_items ADD COLUMN category_id INTEGER REFERENCES food_categories(id) ON DELETE SET NULL")
-    if "is_active" not in food_columns:
-        statements.append("ALTER TABLE food_items ADD COLUMN is_active BOOLEAN DEFAULT TRUE")
-    # allow manual foods without barcodes
-    with engine.begin() as connection:
-        if "barcode" in food_columns:
-            connection.execute(text("ALTER TABLE food_items ALTER COLUMN barcode DROP NOT NULL"))
-        for statement in statements:
-            connection.execute(text(statement))
-            print(f"✔ Applied migration: {statement}")
-
-
-_ensure_food_schema()
-
-
-def _ensure_meal_schema():
-    inspector = inspect(engine)
-    tables = inspector.get_table_names()
-    if "meal_configs" not in tables:
-        MealConfig.__table__.create(engine)
-        print("✔ Created meal_configs table")
-
-    food_log_columns = {col["name"] for col in inspector.get_columns("food_logs")}
-    statements = []
-    if "meal_type" not in food_log_columns:
-        statements.append("ALTER TABLE food_logs ADD COLUMN meal_type TEXT")
-    with engine.begin() as connection:
-        for statement in statements:
-            connection.execute(text(statement))
-            print(f"✔ Applied migration: {statement}")
-        connection.execute(text("UPDATE food_logs SET meal_type = 'unspecified' WHERE meal_type IS NULL"))
-
-
-_ensure_meal_schema()
+SEED_STATE_TABLE = "seed_state"
+# Derived from the seed data, so editing any default above makes the next boot seed again.
+SEED_VERSION = hashlib.sha1(
+    repr(
+        (
+            FREE_WEEK_TEMPLATE,
+            PREMIUM_WEEK_TEMPLATE,
+            DEFAULT_FOOD_CATEGORIES,
+            DEFAULT_EXERCISE_LIBRARY_ITEMS,
+            DEFAULT_MEALS,
+            DEFAULT_GOAL_QUESTIONS,
+            DEFAULT_FOODS,
+        )
+    ).encode()
+).hexdigest()[:12]
 
 
 def _backfill_manual_log_macros(db):
     """Populate missing macro totals for existing manual food logs."""
-    logs = (
-        db.query(FoodLog)
-        .join(FoodItem, FoodLog.food_item_id == FoodItem.id)
-        .filter(FoodItem.source == "manual")
-        .all()
-    )
-    updates = 0
-
-    for log in logs:
-        item = log.food_item
-        if not item:
-            continue
-        servings = log.serving_multiplier or 1.0
-        changed = False
-
-        def update_field(field: str, item_value: float | None):
-            nonlocal changed
-            if item_value is None:
-                return
-            current_value = getattr(log, field)
-            if current_value is None or current_value == 0:
-                setattr(log, field, item_value * servings)
-                changed = True
-
-        update_field("calories", item.calories)
-        update_field("protein", item.protein)
-        update_field("carbs", item.carbs)
-        update_field("fat", item.fat)
-
-        if changed:
-            updates += 1
+    servings = func.coalesce(func.nullif(FoodLog.serving_multiplier, 0), 1.0)
+    values = {}
+    needs_backfill = []
+    for field in ("calories", "protein", "carbs", "fat"):
+        log_value = getattr(FoodLog, field)
+        item_value = getattr(FoodItem, field)
+        # A logged value of NULL or 0 is filled from the item, when the item has one.
+        missing = and_(or_(log_value.is_(None), log_value == 0), item_value.isnot(None))
+        values[field] = case((missing, item_value * servings), else_=log_value)
+        needs_backfill.append(missing)
+
+    # One set-based UPDATE ... FROM food_items instead of loading and updating each log.
+    updates = db.execute(
+        update(FoodLog)
+        .where(
+            FoodLog.food_item_id == FoodItem.id,
+            FoodItem.source == "manual",
+            or_(*needs_backfill),
+        )
+        .values(values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
 
     if updates:
-        db.commit()
         print(f"✔ Backfilled macros for {updates} manual food logs")
+
+
 def _build_days(program: Program, template: list[dict]):
     days = []
     total_days = program.duration_days
@@ -364,39 +310,51 @@ def seed_programs(db):
 
 
 def seed_food_catalog(db):
-    name_to_category = {}
-    for config in DEFAULT_FOOD_CATEGORIES:
-        name = config["name"]
-        existing = (
-            db.query(FoodCategory)
-            .filter(func.lower(FoodCategory.name) == name.lower())
-            .first()
+    # One lookup and one multi-row insert per table instead of a query and INSERT per entry.
+    wanted_categories = {config["name"].lower(): config for config in DEFAULT_FOOD_CATEGORIES}
+    category_ids = {}
+    if wanted_categories:
+        rows = db.execute(
+            select(func.lower(FoodCategory.name), FoodCategory.id)
+            .where(func.lower(FoodCategory.name).in_(wanted_categories))
+            .order_by(FoodCategory.id)
         )
-        if existing:
-            name_to_category[name.lower()] = existing
-            continue
-        category = FoodCategory(
-            name=name,
-            description=config.get("description"),
-            is_active=True,
+        for name_key, category_id in rows:
+            category_ids.setdefault(name_key, category_id)
+    new_categories = [
+        {"name": config["name"], "description": config.get("description"), "is_active": True}
+        for name_key, config in wanted_categories.items()
+        if name_key not in category_ids
+    ]
+    if new_categories:
+        inserted = db.execute(
+            insert(FoodCategory).returning(FoodCategory.id, FoodCategory.name),
+            new_categories,
         )
-        db.add(category)
-        db.flush()
-        name_to_category[name.lower()] = category
-        print(f"✔ Seeded food category '{category.name}'")
-
-    for entry in DEFAULT_FOODS:
-        name = entry["name"]
-        existing = (
+        for category_id, name in inserted:
+            category_ids[name.lower()] = category_id
+            print(f"✔ Seeded food category '{name}'")
+
+    wanted_foods = {entry["name"].lower(): entry for entry in DEFAULT_FOODS}
+    existing_foods = {}
+    if wanted_foods:
+        matches = (
             db.query(FoodItem)
             .filter(
-                func.lower(FoodItem.product_name) == name.lower(),
+                func.lower(FoodItem.product_name).in_(wanted_foods),
                 FoodItem.source == "manual",
             )
-            .first()
+            .order_by(FoodItem.id)
         )
+        for food in matches:
+            existing_foods.setdefault(food.product_name.lower(), food)
+
+    new_foods = []
+    for name_key, entry in wanted_foods.items():
+        name = entry["name"]
         category_name = (entry.get("category_name") or "").strip().lower()
-        category = name_to_category.get(category_name)
+        category_id = category_ids.get(category_name)
+        existing = existing_foods.get(name_key)
         if existing:
             updated = False
 
@@ -416,54 +374,74 @@ def seed_food_catalog(db):
             maybe_set("fat")
             maybe_set("serving_quantity")
             maybe_set("serving_unit")
-            if category and existing.category_id is None:
-                existing.category_id = category.id
+            if category_id and existing.category_id is None:
+                existing.category_id = category_id
                 updated = True
             if updated:
                 print(f"✔ Updated nutrition facts for '{existing.product_name}'")
             continue
-        food = FoodItem(
-            product_name=name,
-            calories=entry.get("calories"),
-            protein=entry.get("protein"),
-            carbs=entry.get("carbs"),
-            fat=entry.get("fat"),
-            serving_quantity=entry.get("serving_quantity", 1.0),
-            serving_unit=entry.get("serving_unit", "serving"),
-            source="manual",
-            category_id=category.id if category else None,
-            is_active=True,
+        new_foods.append(
+            {
+                "product_name": name,
+                "calories": entry.get("calories"),
+                "protein": entry.get("protein"),
+                "carbs": entry.get("carbs"),
+                "fat": entry.get("fat"),
+                "serving_quantity": entry.get("serving_quantity", 1.0),
+                "serving_unit": entry.get("serving_unit", "serving"),
+                "source": "manual",
+                "category_id": category_id,
+                "is_active": True,
+            }
         )
-        db.add(food)
         print(f"✔ Seeded food '{name}'")
-    db.commit()
+    if new_foods:
+        db.execute(insert(FoodItem), new_foods)
+
+
+def _insert_ignoring_conflicts(db, model):
+    """Dialect-specific INSERT whose on_conflict_do_nothing() lets a concurrent seeder win the race."""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert(model)
+    return sqlite_insert(model)
 
 
 def seed_exercise_library(db):
-    for config in DEFAULT_EXERCISE_LIBRARY_ITEMS:
-        slug = config["slug"]
-        existing = (
-            db.query(ExerciseLibraryItem)
-            .filter(func.lower(ExerciseLibraryItem.slug) == slug.lower())
-            .first()
-        )
-        if existing:
-            continue
-        item = ExerciseLibraryItem(
-            slug=slug,
-            title=config["title"],
-            sort_order=config.get("sort_order", 0),
-            is_active=True,
-        )
-        db.add(item)
-        print(f"✔ Seeded exercise library item '{item.title}'")
-    db.commit()
+    # One SELECT for every slug already present, instead of one lookup per default item.
+    existing_slugs = set(db.scalars(select(func.lower(ExerciseLibraryItem.slug))).all())
+    new_rows = [
+        {
+            "slug": config["slug"],
+            "title": config["title"],
+            "sort_order": config.get("sort_order", 0),
+            "is_active": True,
+        }
+        for config in DEFAULT_EXERCISE_LIBRARY_ITEMS
+        if config["slug"].lower() not in existing_slugs
+    ]
+    if not new_rows:
+        return
+    # Another worker seeding at the same time may insert a slug first; skip it instead of failing the seed.
+    inserted = db.execute(
+        _insert_ignoring_conflicts(db, ExerciseLibraryItem)
+        .values(new_rows)
+        .on_conflict_do_nothing(index_elements=[ExerciseLibraryItem.slug])
+        .returning(ExerciseLibraryItem.title)
+    ).scalars()
+    for title in inserted:
+        print(f"✔ Seeded exercise library item '{title}'")
 
 
 def seed_meals(db):
+    wanted_keys = [config["key"].lower() for config in DEFAULT_MEALS]
+    existing_meals = {
+        meal.key.lower(): meal
+        for meal in db.scalars(select(MealConfig).where(func.lower(MealConfig.key).in_(wanted_keys)))
+    }
+    new_rows = []
     for config in DEFAULT_MEALS:
         key = config["key"]
-        existing = db.query(MealConfig).filter(func.lower(MealConfig.key) == key.lower()).first()
+        existing = existing_meals.get(key.lower())
         if existing:
             updated = False
             for field in ("name", "min_ratio", "max_ratio", "sort_order"):
@@ -476,37 +454,53 @@ def seed_meals(db):
             if updated:
                 print(f"✔ Updated meal config '{existing.key}'")
             continue
-        meal = MealConfig(
-            key=key,
-            name=config["name"],
-            min_ratio=config.get("min_ratio", 0),
-            max_ratio=config.get("max_ratio", 0),
-            sort_order=config.get("sort_order", 0),
-            is_active=True,
+        new_rows.append(
+            {
+                "key": key,
+                "name": config["name"],
+                "min_ratio": config.get("min_ratio", 0),
+                "max_ratio": config.get("max_ratio", 0),
+                "sort_order": config.get("sort_order", 0),
+                "is_active": True,
+            }
         )
-        db.add(meal)
-        print(f"✔ Seeded meal '{meal.name}'")
-    db.commit()
+    if not new_rows:
+        return
+    inserted = db.execute(
+        _insert_ignoring_conflicts(db, MealConfig)
+        .values(new_rows)
+        .on_conflict_do_nothing(index_elements=[MealConfig.key])
+        .returning(MealConfig.name)
+    ).scalars()
+    for name in inserted:
+        print(f"✔ Seeded meal '{name}'")
 
 
 def seed_goal_questions(db):
+    # Load every seeded question with its options up front instead of querying per entry.
+    question_texts = [config["question"] for config in DEFAULT_GOAL_QUESTIONS]
+    existing_questions = {}
+    matches = (
+        db.query(Question)
+        .options(selectinload(Question.options))
+        .filter(Question.question.in_(question_texts))
+        .order_by(Question.id)
+    )
+    for question in matches:
+        existing_questions.setdefault(question.question, question)
+
+    seeded = []
     for config in DEFAULT_GOAL_QUESTIONS:
         question_text = config["question"]
-        existing = db.query(Question).filter(Question.question == question_text).first()
-        if existing:
-            question = existing
-            updated = False
+        question = existing_questions.get(question_text)
+        if question:
             if question.description != config.get("description"):
                 question.description = config.get("description")
-                updated = True
             if question.answer_type != config["answer_type"]:
                 question.answer_type = config["answer_type"]
-                updated = True
             if question.is_required != config.get("is_required", False):
                 question.is_required = config.get("is_required", False)
-                updated = True
-            if updated:
-                db.flush()
+            existing_option_texts = {opt.option_text.lower() for opt in question.options}
         else:
             question = Question(
                 question=question_text,
@@ -517,69 +511,101 @@ def seed_goal_questions(db):
                 is_active=True,
             )
             db.add(question)
-            db.flush()
+            existing_questions[question_text] = question
+            existing_option_texts = set()
             print(f"✔ Seeded goal question '{question.question}'")
-
-        options = config.get("options") or []
-        if options:
-            existing_options = {opt.option_text.lower(): opt for opt in question.options}
-            for option in options:
-                option_text = option["option_text"].strip()
-                if option_text.lower() in existing_options:
-                    continue
-                db.add(
-                    AnswerOption(
-                        question_id=question.id,
-                        option_text=option_text,
-                        value=option.get("value"),
-                        is_active=True,
-                    )
-                )
-            db.flush()
-    db.commit()
+        seeded.append((question, config.get("options") or [], existing_option_texts))
+
+    # One flush assigns ids to every new question before their options are inserted together.
+    db.flush()
+    option_rows = [
+        {
+            "question_id": question.id,
+            "option_text": option["option_text"].strip(),
+            "value": option.get("value"),
+            "is_active": True,
+        }
+        for question, options, existing_option_texts in seeded
+        for option in options
+        if option["option_text"].strip().lower() not in existing_option_texts
+    ]
+    if option_rows:
+        db.execute(insert(AnswerOption), option_rows)
+
+
+def _seeded_version(db):
+    db.execute(
+        text(f"CREATE TABLE IF NOT EXISTS {SEED_STATE_TABLE} (name VARCHAR(255) PRIMARY KEY, value TEXT)")
+    )
+    return db.execute(
+        text(f"SELECT value FROM {SEED_STATE_TABLE} WHERE name = 'last_seed_version'")
+    ).scalar()
+
+
+def _record_seed_version(db):
+    # Upsert so a worker finishing the same seed concurrently cannot fail on the primary key.
+    db.execute(
+        text(
+            f"INSERT INTO {SEED_STATE_TABLE} (name, value) VALUES ('last_seed_version', :value) "
+            "ON CONFLICT (name) DO UPDATE SET value = excluded.value"
+        ),
+        {"value": SEED_VERSION},
+    )
 
 
 def run_seed():
-    db = SessionLocal()
+    # Read values from .env
+    first_name = os.getenv("SEED_FIRST_NAME", "Test")
+    last_name = os.getenv("SEED_LAST_NAME", "User")
+    email = os.getenv("SEED_EMAIL", "test@yopmail.com")
+    gender = os.getenv("SEED_GENDER", "Male")
+
     try:
-        # Read values from .env
-        first_name = os.getenv("SEED_FIRST_NAME", "Test")
-        last_name = os.getenv("SEED_LAST_NAME", "User")
-        email = os.getenv("SEED_EMAIL", "test@yopmail.com")
-        gender = os.getenv("SEED_GENDER", "Male")
-
-        # If database has no users create default admin
-        if db.query(User).count() == 0:
-            admin_user = User(
-                first_name=first_name,
-                last_name=last_name,
-                email=email,
-                otp=None,
-                phone=None,
-                dob=None,
-                gender=gender,
-                photo=None,
-                is_active=True,
-                is_admin=True,
-            )
+        # One transaction for every section; a failure anywhere rolls the whole seed back.
+        with SessionLocal() as db, db.begin():
+            # Create the default admin only while the users table is empty, in one INSERT ... SELECT.
+            admin_values = {
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": email,
+                "gender": gender,
+                "is_active": True,
+                "is_admin": True,
+            }
+            seeded = db.execute(
+                insert(User).from_select(
+                    list(admin_values),
+                    select(*(literal(value) for value in admin_values.values())).where(
+                        ~exists(select(User.id))
+                    ),
+                )
+            ).rowcount
+            if seeded:
+                print("✔ Default admin user seeded!")
+            else:
+                print("✔ Users already present, skipping seeding.")
+
+            # The catalog seeders and backfill already ran for this seed data; nothing left to do.
+            if _seeded_version(db) == SEED_VERSION:
+                return
 
-            db.add(admin_user)
-            db.commit()
-            print("✔ Default admin user seeded!")
-        else:
-            print("✔ Users already present, skipping seeding.")
-
-        seed_programs(db)
-        seed_food_catalog(db)
-        seed_exercise_library(db)
-        seed_meals(db)
-        seed_goal_questions(db)
-        _backfill_manual_log_macros(db)
-        db.commit()
+            seed_programs(db)
+            seed_food_catalog(db)
+            seed_exercise_library(db)
+            seed_meals(db)
+            seed_goal_questions(db)
+            _backfill_manual_log_macros(db)
+            _record_seed_version(db)
     except Exception as e:
         print("❌ Seeding error:", e)
-    finally:
-        db.close()
+
 
 if __name__ == "__main__":
+    import app.models
+
+    # Register every model, not only those imported above, so foreign keys resolve in create_all.
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+    create_missing_tables(engine, Base.metadata)
+    run_startup_migrations(engine)
     run_seed()
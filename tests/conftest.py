@@ -4,6 +4,7 @@ from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 # Ensure predictable environment variables for tests before importing the app.
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -17,18 +18,53 @@ os.environ.setdefault("JWT_SECRET", "test-secret")
 os.environ.setdefault("WATER_REMINDER_AUTO_ENABLED", "false")
 
 import app.main as main  # noqa: E402  (import after env vars are set)
+from app.database import SessionLocal, engine  # noqa: E402
 
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, _connection_record):
+        # Per-connection settings only: journal_mode=WAL would persist in test.db itself.
+        # Relaxed syncing keeps the many small test/seed commits off the fsync path.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+
+    # Importing the app already pooled a connection; drop it so every connection gets the pragmas.
+    engine.dispose()
 
-@pytest.fixture()
-def client(monkeypatch):
-    """Provide a TestClient with startup tasks patched out for isolation."""
-    monkeypatch.setattr(main, "run_seed", lambda: None)
+
+@pytest.fixture(scope="session")
+def _test_client():
+    """Start one TestClient for the whole session, with startup tasks patched out for isolation."""
 
     async def _noop_async(*args, **kwargs):
         return None
 
-    monkeypatch.setattr(main.reminder_scheduler, "start", _noop_async)
-    monkeypatch.setattr(main.reminder_scheduler, "stop", _noop_async)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(main, "run_seed", lambda: None)
+        mp.setattr(main.reminder_scheduler, "start", _noop_async)
+        mp.setattr(main.reminder_scheduler, "stop", _noop_async)
+
+        with TestClient(main.app) as test_client:
+            yield test_client
+
+
+@pytest.fixture()
+def client(_test_client):
+    """Provide the shared TestClient and drop any dependency overrides a test left behind."""
+    yield _test_client
+    main.app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
+def db_session(_test_client):
+    """One SQLAlchemy session reused by every test that seeds data directly.
 
-    with TestClient(main.app) as test_client:
-        yield test_client
+    Depends on the client so app startup has created and migrated the schema first.
+    """
+    session = SessionLocal()
+    yield session
+    session.close()
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from app.services.measurement_utils import (
+    convert_height_to_m,
+    parse_numeric_value,
+    resolve_height_unit,
+    resolve_weight_unit,
+    weight_kg_from_answer,
+)
+
+
+def _answer(answer_text: str, *option_values: str):
+    selections = [
+        SimpleNamespace(option=SimpleNamespace(value=value, option_text=value))
+        for value in option_values
+    ]
+    return SimpleNamespace(answer_text=answer_text, selected_options=selections)
+
+
+def test_parse_numeric_value_extracts_first_number():
+    assert parse_numeric_value("about 72.5 kg") == 72.5
+    assert parse_numeric_value("-3") == -3.0
+    assert parse_numeric_value("no digits") is None
+    assert parse_numeric_value(None) is None
+
+
+def test_unit_aliases_resolve_to_canonical_units():
+    assert resolve_weight_unit(_answer("150", " Pounds ")) == "lb"
+    assert resolve_weight_unit(_answer("70", "kg")) == "kg"
+    assert resolve_height_unit(_answer("180", "Centimeters")) == "cm"
+    assert resolve_height_unit(_answer("6", "unknown")) is None
+
+
+def test_weight_kg_from_answer_converts_pounds():
+    assert round(weight_kg_from_answer(_answer("100", "lbs")), 3) == 45.359
+
+
+def test_convert_height_to_m_uses_unit_factor():
+    assert convert_height_to_m(180, "cm") == 1.8
+    assert round(convert_height_to_m(6, "ft"), 4) == 1.8288
+    assert convert_height_to_m(1.75, None) == 1.75
+    assert convert_height_to_m(-1, "cm") is None
@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app import main
+from app.models.user import User
+from app.services.auth_middleware import get_current_user
+
+
+@pytest.fixture()
+def cached_user(client, db_session):
+    user = User(
+        email=f"profile-{uuid.uuid4().hex}@example.com",
+        dob="1990-01-01",
+        gender="Female",
+        target_calories_cached=1800,
+        target_weight_kg_cached=60.0,
+        target_cached_at=datetime.utcnow(),
+    )
+    db_session.add(user)
+    db_session.commit()
+    main.app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=user.id)
+    yield user
+    main.app.dependency_overrides.pop(get_current_user, None)
+    db_session.delete(user)
+    db_session.commit()
+
+
+@pytest.mark.parametrize("field, value", [("dob", "1985-06-15"), ("gender", "Male")])
+def test_update_profile_invalidates_cached_target_on_dob_or_gender(
+    client, db_session, cached_user, field, value
+):
+    response = client.put("/profile/update", json={field: value})
+    assert response.status_code == 200
+
+    db_session.refresh(cached_user)
+    assert getattr(cached_user, field) == value
+    assert cached_user.target_cached_at is None
+
+
+def test_update_profile_keeps_cached_target_for_other_fields(client, db_session, cached_user):
+    cached_at = cached_user.target_cached_at
+
+    response = client.put("/profile/update", json={"first_name": "Sam"})
+    assert response.status_code == 200
+
+    db_session.refresh(cached_user)
+    assert cached_user.first_name == "Sam"
+    assert cached_user.target_cached_at == cached_at
@@ -1,18 +1,24 @@
 from types import SimpleNamespace
 
 import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
 
 from app import main
-from app.database import SessionLocal
 from app.models.program import Program, ProgramDay
-from app.services.auth_middleware import get_current_user
+from app.services import dashboard_service
+from app.services.auth_middleware import get_current_admin, get_current_user
 
 
 def _dummy_user():
     return SimpleNamespace(id=1, email="test@example.com", is_admin=False, is_active=True)
 
 
-def _seed_program(session: SessionLocal, slug: str = "test-plan", duration: int = 5) -> Program:
+def _dummy_admin():
+    return SimpleNamespace(id=1, email="admin@example.com", is_admin=True, is_active=True)
+
+
+def _seed_program(session: Session, slug: str = "test-plan", duration: int = 5) -> Program:
     session.query(ProgramDay).delete()
     session.query(Program).delete()
     program = Program(
@@ -33,37 +39,44 @@ def _seed_program(session: SessionLocal, slug: str = "test-plan", duration: int
     )
     session.add(program)
     session.flush()
-    for index in range(duration):
-        session.add(
-            ProgramDay(
-                program_id=program.id,
-                day_number=index + 1,
-                title=f"Day {index + 1}",
-                focus="Strength",
-                description="Demo day",
-                is_rest_day=index % 7 in (5, 6),
-                workout_summary="Summary",
-                duration_minutes=25,
-            )
-        )
+    session.execute(
+        insert(ProgramDay),
+        [
+            {
+                "program_id": program.id,
+                "day_number": index + 1,
+                "title": f"Day {index + 1}",
+                "focus": "Strength",
+                "description": "Demo day",
+                "is_rest_day": index % 7 in (5, 6),
+                "workout_summary": "Summary",
+                "duration_minutes": 25,
+            }
+            for index in range(duration)
+        ],
+    )
     session.commit()
     return program
 
 
 @pytest.fixture(autouse=False)
-def override_user():
+def override_user(client):
+    # Depend on the shared client so this override is set after, and removed before, its teardown.
     main.app.dependency_overrides[get_current_user] = _dummy_user
     yield
     main.app.dependency_overrides.pop(get_current_user, None)
 
 
-def test_list_programs_returns_seeded_programs(client, override_user):
-    session = SessionLocal()
-    try:
-        program = _seed_program(session)
-        seeded = {"slug": program.slug, "title": program.title}
-    finally:
-        session.close()
+@pytest.fixture(autouse=False)
+def override_admin(client):
+    main.app.dependency_overrides[get_current_admin] = _dummy_admin
+    yield
+    main.app.dependency_overrides.pop(get_current_admin, None)
+
+
+def test_list_programs_returns_seeded_programs(client, override_user, db_session):
+    program = _seed_program(db_session)
+    seeded = {"slug": program.slug, "title": program.title}
 
     response = client.get("/programs")
     assert response.status_code == 200
@@ -76,13 +89,9 @@ def test_list_programs_returns_seeded_programs(client, override_user):
     assert returned["requires_payment"] is False
 
 
-def test_program_detail_returns_full_schedule(client, override_user):
-    session = SessionLocal()
-    try:
-        program = _seed_program(session, slug="detail-plan", duration=3)
-        slug = program.slug
-    finally:
-        session.close()
+def test_program_detail_returns_full_schedule(client, override_user, db_session):
+    program = _seed_program(db_session, slug="detail-plan", duration=3)
+    slug = program.slug
 
     response = client.get(f"/programs/{slug}")
     assert response.status_code == 200
@@ -91,3 +100,15 @@ def test_program_detail_returns_full_schedule(client, override_user):
     assert len(payload["days"]) == 3
     assert payload["timeline"]["total_days"] == 3
     assert payload["timeline"]["rest_days"] >= 0
+
+
+def test_admin_day_delete_invalidates_dashboard_metrics(client, override_admin, db_session):
+    program = _seed_program(db_session, slug="metrics-plan", duration=2)
+    slug = program.slug
+    day_id = db_session.query(ProgramDay.id).filter(ProgramDay.program_id == program.id).first()[0]
+    dashboard_service.get_dashboard_metrics(db_session)
+    assert dashboard_service._metrics_cache is not None
+
+    response = client.delete(f"/programs/admin/{slug}/days/{day_id}")
+    assert response.status_code == 200
+    assert dashboard_service._metrics_cache is None
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+from app.utils import scheduler_lock
+from app.utils.scheduler_lock import SchedulerLock
+
+
+class _FakeServer:
+    """Postgres stand-in: one advisory lock owner, and sessions that can be killed."""
+
+    def __init__(self):
+        self.owner = None
+        self.down = False
+
+    def connect(self):
+        if self.down:
+            raise ConnectionError("server unavailable")
+        return _FakeConnection(self)
+
+
+class _FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.alive = True
+
+    def execute(self, statement, params=None):
+        if not self.alive or self.server.down:
+            raise ConnectionError("connection lost")
+        sql = str(statement)
+        if "pg_try_advisory_lock" in sql:
+            if self.server.owner is None:
+                self.server.owner = self
+            return SimpleNamespace(scalar=lambda: self.server.owner is self)
+        if "pg_advisory_unlock" in sql and self.server.owner is self:
+            self.server.owner = None
+        return SimpleNamespace(scalar=lambda: 1)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.kill()
+
+    def kill(self):
+        # Postgres drops session-level advisory locks when the session ends.
+        self.alive = False
+        if self.server.owner is self:
+            self.server.owner = None
+
+
+def _use_server(monkeypatch):
+    server = _FakeServer()
+    fake_engine = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), connect=server.connect)
+    monkeypatch.setattr(scheduler_lock, "engine", fake_engine)
+    return server
+
+
+def test_follower_takes_over_when_the_leader_session_drops(monkeypatch):
+    server = _use_server(monkeypatch)
+    leader, follower = SchedulerLock("reminders"), SchedulerLock("reminders")
+
+    assert leader.acquire()
+    assert not follower.acquire()
+    assert leader.acquire()  # the holder keeps leadership while its session is alive
+
+    server.owner.kill()
+
+    assert follower.acquire()
+    assert not leader.acquire()
+
+
+def test_acquire_reports_no_leader_while_the_database_is_down(monkeypatch):
+    server = _use_server(monkeypatch)
+    lock = SchedulerLock("reminders")
+    assert lock.acquire()
+
+    server.down = True
+    assert not lock.acquire()
+
+    server.down = False
+    assert lock.acquire()
@@ -0,0 +1,131 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.database import engine
+from app.models.question import AnswerOption, Question, UserAnswer, UserAnswerOption
+from app.models.user import User
+from app.models.weight import WeightLog
+from app.services import weight_service
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "sqlite", reason="covers the non-Postgres branch of weight_service"
+)
+
+
+@pytest.fixture()
+def db(db_session):
+    """The shared session, rolled back after each test so nothing persists in test.db."""
+    yield db_session
+    db_session.rollback()
+
+
+@pytest.fixture()
+def user(db):
+    user = User(email=f"weight-{uuid.uuid4().hex}@example.com")
+    db.add(user)
+    db.flush()
+    return user
+
+
+@pytest.fixture()
+def weight_question(db, monkeypatch):
+    question = Question(question="What is your current weight?", answer_type="weight", is_active=True)
+    question.options = [
+        AnswerOption(option_text="lbs", value="lbs"),
+        AnswerOption(option_text="kg", value="kg"),
+    ]
+    db.add(question)
+    db.flush()
+    # Other active weight questions may already exist in test.db; pin the one under test.
+    monkeypatch.setattr(weight_service, "_weight_question_id", lambda _db: question.id)
+    weight_service.invalidate_kg_option(question.id)
+    yield question
+    weight_service.invalidate_kg_option(question.id)
+
+
+def _option_id(question: Question, value: str) -> int:
+    return next(option.id for option in question.options if option.value == value)
+
+
+def _weight_answer(answer_text: str, created_at: datetime):
+    return SimpleNamespace(answer_text=answer_text, selected_options=[], created_at=created_at)
+
+
+def _logs(db, user):
+    return db.query(WeightLog).filter(WeightLog.user_id == user.id).order_by(WeightLog.logged_at).all()
+
+
+def test_add_weight_log_replaces_todays_log(db, user):
+    noon = datetime.combine(date.today(), time(12))
+
+    assert weight_service.add_weight_log_from_answer(db, user, _weight_answer("70 kg", noon))
+    assert weight_service.add_weight_log_from_answer(
+        db, user, _weight_answer("72 kg", noon + timedelta(hours=1))
+    )
+
+    logs = _logs(db, user)
+    assert len(logs) == 1
+    assert logs[0].weight_kg == pytest.approx(72)
+    assert logs[0].logged_at == noon + timedelta(hours=1)
+
+
+def test_add_weight_log_inserts_for_a_new_day(db, user):
+    yesterday = datetime.combine(date.today() - timedelta(days=1), time(12))
+    db.add(WeightLog(user_id=user.id, weight_kg=71, logged_at=yesterday))
+    db.flush()
+
+    noon = datetime.combine(date.today(), time(12))
+    assert weight_service.add_weight_log_from_answer(db, user, _weight_answer("70 kg", noon))
+
+    logs = _logs(db, user)
+    assert [(log.weight_kg, log.logged_at) for log in logs] == [(71, yesterday), (70, noon)]
+
+
+def test_add_weight_log_ignores_unparseable_answers(db, user):
+    noon = datetime.combine(date.today(), time(12))
+
+    assert not weight_service.add_weight_log_from_answer(db, user, _weight_answer("n/a", noon))
+    assert _logs(db, user) == []
+
+
+def test_sync_weight_answer_creates_answer_with_kg_selection(db, user, weight_question):
+    answer = weight_service.sync_weight_answer_from_log(db, user, 70.25)
+    db.flush()
+
+    assert answer.answer_text == "70.2 kg"
+    selections = db.query(UserAnswerOption).filter(UserAnswerOption.user_answer_id == answer.id).all()
+    assert [selection.option_id for selection in selections] == [_option_id(weight_question, "kg")]
+
+
+@pytest.mark.parametrize("existing_selections", [0, 1, 3])
+def test_sync_weight_answer_leaves_one_kg_selection(db, user, weight_question, existing_selections):
+    answer = UserAnswer(user_id=user.id, question_id=weight_question.id, answer_text="150 lbs")
+    db.add(answer)
+    db.flush()
+    lbs_id = _option_id(weight_question, "lbs")
+    db.add_all(
+        UserAnswerOption(user_answer_id=answer.id, option_id=lbs_id)
+        for _ in range(existing_selections)
+    )
+    db.flush()
+    first_selection_id = (
+        db.query(UserAnswerOption.id)
+        .filter(UserAnswerOption.user_answer_id == answer.id)
+        .order_by(UserAnswerOption.id)
+        .limit(1)
+        .scalar()
+    )
+
+    synced = weight_service.sync_weight_answer_from_log(db, user, 68)
+    db.flush()
+
+    assert synced.id == answer.id
+    assert synced.answer_text == "68.0 kg"
+    selections = db.query(UserAnswerOption).filter(UserAnswerOption.user_answer_id == answer.id).all()
+    assert [selection.option_id for selection in selections] == [_option_id(weight_question, "kg")]
+    if existing_selections:
+        # The earliest selection is repointed in place rather than replaced.
+        assert selections[0].id == first_selection_id